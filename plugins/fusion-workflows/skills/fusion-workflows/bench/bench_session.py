@@ -0,0 +1,109 @@
+"""
+Benchmark the pooled cs_auth session against per-call requests.get, using a
+local stub API server (no credentials or network needed).
+
+Usage:
+    python bench/bench_session.py                      # plain HTTP
+    python bench/bench_session.py --tls cert.pem key.pem
+
+For TLS, create a throwaway self-signed certificate first:
+    openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=127.0.0.1 \\
+        -addext subjectAltName=IP:127.0.0.1 -keyout key.pem -out cert.pem
+
+The gain comes mostly from skipping the TCP+TLS handshake, so expect a much
+larger speedup with --tls than over plain loopback HTTP.
+"""
+
+import argparse
+import json
+import os
+import socket
+import ssl
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers the token endpoint and any GET with a small JSON body."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle plus
+        # delayed ACK stalls every keep-alive response by ~40 ms
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(201, {"access_token": "bench-token", "expires_in": 1799})
+
+    def do_GET(self):
+        self._reply(200, {"resources": [{"id": "a"}], "errors": []})
+
+
+def start_stub(tls=None):
+    """Start the stub server on a free port. Returns its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    scheme = "http"
+    if tls:
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(*tls)
+        server.socket = ctx.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"{scheme}://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-call HTTP against a stub server")
+    parser.add_argument("-n", type=int, default=300, help="Sequential GETs per variant (default: 300)")
+    parser.add_argument("--tls", nargs=2, metavar=("CERT", "KEY"), help="Serve HTTPS with this certificate")
+    args = parser.parse_args()
+
+    base = start_stub(args.tls)
+    if args.tls:
+        os.environ["REQUESTS_CA_BUNDLE"] = args.tls[0]
+    # Isolate from any real .env, token cache and rate limit
+    os.environ.update(
+        CS_BASE_URL=base, CS_CLIENT_ID="bench", CS_CLIENT_SECRET="bench",
+        CS_ENV_FILE=os.path.join(os.path.dirname(os.path.abspath(__file__)), "nonexistent.env"),
+        CS_TOKEN_CACHE="off", CS_RATE_LIMIT="100000000", CS_RATE_BURST="100000",
+    )
+    import cs_auth
+
+    start = time.perf_counter()
+    for _ in range(args.n):
+        requests.get(f"{base}/x", headers={"Authorization": "Bearer bench-token"}).json()
+    per_call = (time.perf_counter() - start) / args.n
+
+    cs_auth.api_get("/x")  # fetch the token and open the pooled connection
+    start = time.perf_counter()
+    for _ in range(args.n):
+        cs_auth.api_get("/x")
+    pooled = (time.perf_counter() - start) / args.n
+
+    print(f"{'HTTPS' if args.tls else 'HTTP'}, {args.n} sequential GETs:")
+    print(f"  per-call requests.get  {per_call * 1000:.2f} ms/call")
+    print(f"  pooled session         {pooled * 1000:.2f} ms/call  ({per_call / pooled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
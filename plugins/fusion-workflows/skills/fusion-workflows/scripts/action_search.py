@@ -4,22 +4,38 @@ Search and inspect CrowdStrike Fusion workflow actions via the live API.
 Usage:
     python action_search.py --search "contain"        # Search by name
     python action_search.py --details <action_id>     # Full schema for one action
+    python action_search.py --details <id1> <id2>     # Full schemas for several actions
+    python action_search.py --from-yaml workflow.yaml # Full schemas for every action in a workflow
     python action_search.py --list --limit 50         # Browse paginated
     python action_search.py --vendors                 # List all vendors/integrations
     python action_search.py --vendor "Okta" --list    # Filter to a specific vendor
     python action_search.py --use-case "Identity"     # Filter by use case
     python action_search.py --search "contain" --json # Machine-readable output
+    python action_search.py --search "contian" --ranked --limit 5  # Top 5 by relevance (typo-tolerant)
+    python action_search.py --refresh-cache           # Revalidate the local action cache
     python action_search.py --clear-cache             # Clear the local action cache
 """
 
 import argparse
+import contextlib
+import hashlib
+import heapq
 import json
+import math
+import re
 import sys
 import os
+import sqlite3
+import subprocess
+import tempfile
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from cs_auth import load_env, api_get
+from cs_auth import load_env, api_get, file_lock
 
 # Fix Windows console encoding
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
@@ -30,9 +46,14 @@ ACTIVITIES_ENTITIES = "/workflows/entities/activities/v1"
 # Cache settings — full catalog is cached locally to avoid repeated full scans.
 # The cache is only used for operations that must scan all actions (--vendors,
 # --use-case).  Targeted searches use server-side FQL filtering and skip the cache.
+# The catalog lives in an indexed SQLite database so vendor, use-case and name
+# lookups are queries rather than a parse-and-scan of the whole catalog.
 _CACHE_DIR = os.path.dirname(os.path.abspath(__file__))
-_CACHE_FILE = os.path.join(_CACHE_DIR, ".action_cache.json")
-_CACHE_TTL = 3600  # 1 hour
+_CACHE_FILE = os.path.join(_CACHE_DIR, ".action_cache.db")
+_LEGACY_CACHE_FILE = os.path.join(_CACHE_DIR, ".action_cache.json")
+_DETAILS_FILE = os.path.join(_CACHE_DIR, ".action_details.db")
+_CACHE_TTL = 3600  # 1 hour before revalidating
+_PAGE_SIZE = 200
 
 
 # ── Server-side FQL filtering ──────────────────────────────────────────────
@@ -45,7 +66,9 @@ _CACHE_TTL = 3600  # 1 hour
 def _fql_search(query, vendor_filter=None, limit=200):
     """Search actions using server-side FQL filter.  Returns (results, total).
 
-    Falls back to None on FQL error so the caller can retry client-side.
+    Returns None if the API rejects the filter (4xx) so the caller can retry
+    client-side.  Transient errors are already retried by cs_auth and are
+    raised rather than degrading into a full catalog scan.
     """
     parts = []
     if vendor_filter:
@@ -61,8 +84,11 @@ def _fql_search(query, vendor_filter=None, limit=200):
         params = {"limit": limit, "offset": offset, "filter": fql}
         try:
             resp = api_get(ACTIVITIES_COMBINED, params=params)
-        except Exception:
-            return None  # FQL not supported / transient error — caller retries
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            if 400 <= status < 500 and status != 429:
+                return None  # FQL not supported for this query — caller retries
+            raise
         resources = resp.get("resources", [])
         if not resources:
             break
@@ -81,89 +107,617 @@ def _fql_vendor(vendor, limit=200):
 
 
 # ── Local cache for full-catalog operations ────────────────────────────────
+# Freshness is tiered so the catalog is never discarded wholesale:
+#   < _CACHE_TTL          served as-is
+#   < _CACHE_MAX_STALE    served immediately while a detached process
+#                         revalidates it in the background
+#   older / missing       revalidated before answering
+# Revalidation is incremental: the first and last pages are re-fetched and
+# compared with stored per-page fingerprints; if they and the total match, the
+# cache is kept.  Otherwise (or at least every _CACHE_SWEEP_AGE) every page is
+# fetched and only pages whose fingerprint changed are rewritten — unless most
+# pages changed (e.g. an action inserted near the front shifts every offset),
+# in which case a fresh database is built and swapped in, which is cheaper.
+#
+# A trigram index over action names is kept in the same database, so substring
+# searches are answered locally without a network call once the catalog is
+# cached.  Multi-word searches over descriptions and use cases scan the search
+# text instead: indexing descriptions made the index dominate both the build
+# time and the file size for little gain over a scan of a few MB.  A term index
+# (weighted term frequencies per action plus a vocabulary table) backs the
+# ranked BM25 search with typo tolerance.
+#
+# The `actions` table holds only the narrow columns queries filter and sort on;
+# the wide per-action text (search text and the full JSON, mostly description
+# and schema) lives in `action_docs`.  Filters and scans (vendors, names, use
+# cases, ranking) touch only the narrow table, and JSON is decoded only for
+# the rows a query returns.
+
+_CACHE_MAX_STALE = 7 * 86400
+_CACHE_SWEEP_AGE = 86400
+_SCHEMA_VERSION = "6"
+_DB_TIMEOUT = 30  # seconds to wait on another process's write transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    offset INTEGER PRIMARY KEY,
+    fingerprint TEXT,
+    count INTEGER
+);
+CREATE TABLE IF NOT EXISTS actions (
+    id TEXT PRIMARY KEY,
+    page INTEGER,
+    position INTEGER,
+    name TEXT,
+    name_lower TEXT,
+    vendor TEXT,
+    vendor_lower TEXT,
+    has_permission INTEGER,
+    doc_len REAL,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS action_docs (
+    id TEXT PRIMARY KEY,
+    search_text TEXT,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS vendors (
+    name TEXT PRIMARY KEY,
+    count INTEGER,
+    has_permission INTEGER
+);
+CREATE TABLE IF NOT EXISTS use_cases (
+    action_id TEXT,
+    use_case TEXT,
+    use_case_lower TEXT
+);
+CREATE TABLE IF NOT EXISTS input_properties (
+    action_id TEXT,
+    name TEXT,
+    type TEXT,
+    required INTEGER
+);
+CREATE TABLE IF NOT EXISTS trigrams (
+    gram TEXT,
+    action_id TEXT,
+    PRIMARY KEY (gram, action_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT,
+    action_id TEXT,
+    tf REAL,
+    PRIMARY KEY (term, action_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vocab (
+    term TEXT PRIMARY KEY,
+    df INTEGER,
+    length INTEGER
+);
+"""
+
+# Secondary indexes, created after a fresh build has bulk-loaded its rows
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_actions_page ON actions (page);
+CREATE INDEX IF NOT EXISTS idx_actions_name ON actions (name_lower);
+CREATE INDEX IF NOT EXISTS idx_actions_vendor ON actions (vendor_lower, position);
+CREATE INDEX IF NOT EXISTS idx_use_cases_term ON use_cases (use_case_lower);
+CREATE INDEX IF NOT EXISTS idx_use_cases_action ON use_cases (action_id);
+CREATE INDEX IF NOT EXISTS idx_input_properties_action ON input_properties (action_id);
+CREATE INDEX IF NOT EXISTS idx_vocab_length ON vocab (length);
+"""
+
+_catalog_conn = None  # open catalog for this process (on-disk or in-memory)
+
+
+def _page_fingerprint(resources):
+    """Stable fingerprint of one catalog page (IDs, versions and content)."""
+    digest = hashlib.sha256()
+    for r in resources:
+        digest.update(json.dumps(r, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _search_text(action):
+    """Lower-cased text scanned by multi-word searches."""
+    parts = [action.get("name", ""), action.get("description", "") or ""]
+    parts.extend(action.get("use_cases", []))
+    return "\n".join(parts).lower()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Field weights for ranked search — a name hit counts three description hits.
+_FIELD_WEIGHTS = {"name": 3.0, "vendor": 1.5, "use_cases": 1.5, "description": 1.0}
+
+
+def _tokenize(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def _weighted_terms(action):
+    """Return ({term: weighted_tf}, weighted_length) for one action."""
+    fields = {
+        "name": action.get("name", ""),
+        "vendor": action.get("vendor", ""),
+        "use_cases": " ".join(action.get("use_cases", [])),
+        "description": action.get("description", ""),
+    }
+    tf = {}
+    length = 0.0
+    for field, text in fields.items():
+        weight = _FIELD_WEIGHTS[field]
+        for token in _tokenize(text):
+            tf[token] = tf.get(token, 0.0) + weight
+            length += weight
+    return tf, length
+
+
+def _get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
 
 
-def _load_cache():
-    """Load cached catalog if fresh, else return None."""
+def _set_meta(conn, **values):
+    conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                     [(k, str(v)) for k, v in values.items()])
+
+
+def _drop_actions(conn, rows):
+    """Remove actions given as (id, search_text, data) rows, including their index entries."""
+    ids = [(aid,) for aid, _, _ in rows]
+    conn.executemany("DELETE FROM use_cases WHERE action_id = ?", ids)
+    conn.executemany("DELETE FROM input_properties WHERE action_id = ?", ids)
+    actions = [(aid, json.loads(data)) for aid, _, data in rows]
+    conn.executemany("DELETE FROM trigrams WHERE gram = ? AND action_id = ?",
+                     [(gram, aid) for aid, r in actions for gram in _trigrams(r.get("name", "").lower())])
+    conn.executemany("DELETE FROM terms WHERE term = ? AND action_id = ?",
+                     [(term, aid) for aid, r in actions for term in _weighted_terms(r)[0]])
+    conn.executemany("DELETE FROM actions WHERE id = ?", ids)
+    conn.executemany("DELETE FROM action_docs WHERE id = ?", ids)
+
+
+_DOC_ROWS = "SELECT id, search_text, data FROM action_docs WHERE id IN (SELECT id FROM actions WHERE {})"
+
+
+def _delete_pages(conn, where, params=()):
+    """Remove the pages matching *where* along with their actions."""
+    rows = conn.execute(
+        _DOC_ROWS.format(f"page IN (SELECT offset FROM pages WHERE {where})"), params).fetchall()
+    _drop_actions(conn, rows)
+    conn.execute(f"DELETE FROM pages WHERE {where}", params)
+
+
+_INSERTS = {
+    "pages": "INSERT INTO pages VALUES (?, ?, ?)",
+    "actions": "INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "action_docs": "INSERT INTO action_docs VALUES (?, ?, ?)",
+    "trigrams": "INSERT OR IGNORE INTO trigrams VALUES (?, ?)",
+    "terms": "INSERT INTO terms VALUES (?, ?, ?)",
+    "use_cases": "INSERT INTO use_cases VALUES (?, ?, ?)",
+    "input_properties": "INSERT INTO input_properties VALUES (?, ?, ?, ?)",
+}
+
+
+def _page_rows(pages):
+    """
+    Rows for every table from *pages* ({offset: resources}), keyed by table.
+    An action listed on more than one page is kept where it appears last.
+    """
+    placed = {}
+    for offset in sorted(pages):
+        for i, r in enumerate(pages[offset]):
+            aid = r.get("id", "")
+            placed.pop(aid, None)
+            placed[aid] = (offset, offset + i, r)
+    rows = {table: [] for table in _INSERTS}
+    rows["pages"] = [(off, _page_fingerprint(res), len(res)) for off, res in sorted(pages.items())]
+    for aid, (offset, position, r) in placed.items():
+        text = _search_text(r)
+        tf, doc_len = _weighted_terms(r)
+        data = json.dumps(r)
+        rows["actions"].append(
+            (aid, offset, position, r.get("name", ""), r.get("name", "").lower(),
+             r.get("vendor", "Unknown"), r.get("vendor", "").lower(),
+             int(bool(r.get("has_permission", True))), doc_len,
+             hashlib.sha256(data.encode()).hexdigest()[:16]))
+        rows["action_docs"].append((aid, text, data))
+        rows["trigrams"].extend((gram, aid) for gram in _trigrams(r.get("name", "").lower()))
+        rows["terms"].extend((term, aid, weight) for term, weight in tf.items())
+        rows["use_cases"].extend((aid, uc, uc.lower()) for uc in r.get("use_cases", []))
+        rows["input_properties"].extend(
+            (aid, pname, (pschema or {}).get("type", ""), int(bool((pschema or {}).get("required"))))
+            for pname, pschema in (r.get("properties") or {}).items())
+    # Posting tables are clustered on (key, action_id); sorted rows append to
+    # the B-tree instead of splitting pages all over it
+    rows["trigrams"].sort()
+    rows["terms"].sort()
+    return rows
+
+
+def _write_pages(conn, pages):
+    """Insert *pages* ({offset: resources}) with one executemany per table."""
+    for table, rows in _page_rows(pages).items():
+        conn.executemany(_INSERTS[table], rows)
+
+
+def _changed_pages(conn, pages):
+    """Offsets in *pages* whose stored fingerprint differs (or that are not stored)."""
+    stored = dict(conn.execute("SELECT offset, fingerprint FROM pages"))
+    return [off for off in sorted(pages) if stored.get(off) != _page_fingerprint(pages[off])]
+
+
+def _apply_pages(conn, pages, total, full, fresh=False):
+    """
+    Write changed *pages* ({offset: resources}) into *conn* and refresh the
+    derived tables.  With full=True, stored pages not in *pages* are dropped.
+    With fresh=True, *conn* is a new empty database: everything is bulk-loaded
+    without looking for old rows and the secondary indexes are built last.
+    Returns the number of pages rewritten.
+    """
+    conn.executescript(_SCHEMA if fresh else _SCHEMA + _INDEXES)
+    now = time.time()
+    with conn:
+        if fresh:
+            changed = sorted(pages)
+        else:
+            changed = _changed_pages(conn, pages)
+            if full:
+                keep = ",".join(str(int(off)) for off in pages) or "-1"
+                _delete_pages(conn, f"offset NOT IN ({keep})")
+            else:
+                _delete_pages(conn, "offset >= ?", (total,))
+            if changed:
+                _delete_pages(conn, f"offset IN ({','.join(str(int(off)) for off in changed)})")
+                # Actions may have moved here from pages that are not rewritten
+                ids = [r.get("id", "") for off in changed for r in pages[off]]
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    marks = ",".join("?" * len(chunk))
+                    _drop_actions(conn, conn.execute(
+                        f"SELECT id, search_text, data FROM action_docs WHERE id IN ({marks})", chunk).fetchall())
+        _write_pages(conn, {off: pages[off] for off in changed})
+        conn.execute("DELETE FROM vendors")
+        conn.execute(
+            "INSERT INTO vendors SELECT vendor, COUNT(*), MIN(has_permission) FROM actions GROUP BY vendor")
+        if changed or full:
+            conn.execute("DELETE FROM vocab")
+            conn.execute(
+                "INSERT INTO vocab SELECT term, COUNT(*), length(term) FROM terms GROUP BY term")
+        _set_meta(conn, schema=_SCHEMA_VERSION, total=total, ts=now)
+        if full:
+            _set_meta(conn, swept=now)
+    if fresh:
+        conn.executescript(_INDEXES)
+    return len(changed)
+
+
+def _cache_age(conn):
+    """Seconds since the cache was last revalidated, or None if unusable."""
+    try:
+        if _get_meta(conn, "schema") != _SCHEMA_VERSION:
+            return None
+        return time.time() - float(_get_meta(conn, "ts", 0))
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def _open_cache():
+    """Open the on-disk cache database if it is usable, else return None."""
     if not os.path.isfile(_CACHE_FILE):
         return None
     try:
-        with open(_CACHE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if time.time() - data.get("ts", 0) < _CACHE_TTL:
-            return data["resources"]
-    except (json.JSONDecodeError, KeyError, OSError):
-        pass
-    return None
+        conn = sqlite3.connect(_CACHE_FILE, timeout=_DB_TIMEOUT)
+    except sqlite3.Error:
+        return None
+    if _cache_age(conn) is None:  # corrupt, truncated or old schema — a miss
+        conn.close()
+        return None
+    return conn
 
 
-def _save_cache(resources):
-    """Persist catalog to local cache file."""
+def _save_cache(pages, total):
+    """
+    Build a fresh cache database from *pages* beside the live one, then swap
+    it in with a rename so readers never see a half-written file (a corrupt
+    or incompatible file is simply replaced).  Returns (conn, pages_written)
+    or (None, 0).
+    """
+    tmp = None
     try:
-        with open(_CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump({"ts": time.time(), "resources": resources}, f)
-    except OSError:
-        pass  # non-fatal — next run will just re-fetch
+        fd, tmp = tempfile.mkstemp(dir=_CACHE_DIR, prefix=".action_cache.", suffix=".tmp")
+        os.close(fd)
+        conn = sqlite3.connect(tmp)
+        changed = _apply_pages(conn, pages, total, full=True, fresh=True)
+        conn.close()
+        os.replace(tmp, _CACHE_FILE)
+        return sqlite3.connect(_CACHE_FILE, timeout=_DB_TIMEOUT), changed
+    except (sqlite3.Error, OSError):
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        return None, 0  # non-fatal — next run will just re-fetch
 
 
 def _clear_cache():
-    """Delete the local cache file."""
-    try:
-        os.remove(_CACHE_FILE)
-        return True
-    except FileNotFoundError:
-        return False
+    """Delete the local cache files."""
+    global _catalog_conn
+    if _catalog_conn is not None:
+        _catalog_conn.close()
+        _catalog_conn = None
+    removed = False
+    for path in (_CACHE_FILE, _LEGACY_CACHE_FILE, _DETAILS_FILE):
+        try:
+            os.remove(path)
+            removed = True
+        except FileNotFoundError:
+            pass
+    return removed
 
 
-def _paginate_all(progress=False):
-    """Return the full action catalog, using cache when available.
+def _fetch_page(offset):
+    """Fetch one page of the full catalog. Returns the response body."""
+    return api_get(ACTIVITIES_COMBINED, params={"limit": _PAGE_SIZE, "offset": offset})
 
-    Retries individual page fetches up to 3 times to handle transient
-    connection resets from the CrowdStrike API.
+
+def _fetch_pages(offsets, progress=False, total=0, done=0):
+    """Fetch *offsets* concurrently.  Returns ({offset: resources}, missing_offsets).
+
+    Pages run on CS_PAGE_WORKERS threads, paced by the shared cs_auth rate
+    limiter.  Pages that still fail after the cs_auth retry policy get one
+    more sequential attempt before being reported as missing.
     """
-    cached = _load_cache()
-    if cached is not None:
-        if progress:
-            print(f"  Using cached catalog ({len(cached)} actions, < 1 hr old)")
-        return cached
+    pages = {}
+    counter = [done]
+    lock = threading.Lock()
+
+    def report(count):
+        if not (progress and total):
+            return
+        with lock:
+            counter[0] += count
+            print(f"\r  Scanning actions... ({min(counter[0], total)}/{total})", end="", flush=True)
+
+    report(0)
+    failed = []
+    workers = int(os.environ.get("CS_PAGE_WORKERS", "8"))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_fetch_page, off): off for off in offsets}
+        for future in as_completed(futures):
+            off = futures[future]
+            try:
+                pages[off] = future.result().get("resources", [])
+                report(len(pages[off]))
+            except requests.RequestException:
+                failed.append(off)
 
-    resources = []
-    offset = 0
-    total = None
-    max_retries = 3
-    while True:
-        for attempt in range(1, max_retries + 1):
+    missing = []
+    for off in sorted(failed):
+        try:
+            pages[off] = _fetch_page(off).get("resources", [])
+            report(len(pages[off]))
+        except requests.RequestException:
+            missing.append(off)
+    return pages, missing
+
+
+def _page_offsets(first_page, total):
+    step = len(first_page) or _PAGE_SIZE
+    return list(range(step, total, step)) if first_page else []
+
+
+def refresh_catalog(progress=False, force_sweep=False):
+    """Revalidate the catalog incrementally.  Returns (conn, pages_rewritten).
+
+    conn is the on-disk cache, or an in-memory database holding a partial
+    catalog if some pages could not be fetched (nothing is persisted then).
+
+    Refreshes are single-flight across processes: whoever takes the cache
+    lock first refreshes, and the others wait for it and reuse its result.
+    """
+    if not os.access(_CACHE_DIR, os.W_OK):
+        return _refresh_catalog(progress, force_sweep)  # cache is not writable — nothing to coordinate
+    lock_path = _CACHE_FILE + ".lock"
+    requested = time.time()
+    with file_lock(lock_path, blocking=False) as acquired:
+        if acquired:
+            return _refresh_catalog(progress, force_sweep)
+    if progress:
+        print("  Another process is refreshing the catalog; waiting for it...")
+    with file_lock(lock_path):
+        conn = _open_cache()
+        if conn is not None and float(_get_meta(conn, "ts", 0)) >= requested:
+            if progress:
+                print("  Reusing the catalog it fetched")
+            return conn, 0
+        if conn is not None:
+            conn.close()
+        return _refresh_catalog(progress, force_sweep)
+
+
+def _refresh_catalog(progress, force_sweep):
+    conn = _open_cache()
+    try:
+        first = _fetch_page(0)
+    except requests.RequestException as e:
+        if progress:
+            print(f"  Failed to fetch action catalog: {e}")
+        if conn is not None:
+            return conn, 0  # keep serving the old cache
+        conn = sqlite3.connect(":memory:")
+        _apply_pages(conn, {}, 0, full=True, fresh=True)
+        return conn, 0
+    first_page = first.get("resources", [])
+    total = first.get("meta", {}).get("pagination", {}).get("total", 0)
+    offsets = _page_offsets(first_page, total)
+
+    if conn is not None and not force_sweep:
+        stored = dict(conn.execute("SELECT offset, fingerprint FROM pages"))
+        swept = float(_get_meta(conn, "swept", 0))
+        unchanged = (int(_get_meta(conn, "total", -1)) == total
+                     and stored.get(0) == _page_fingerprint(first_page)
+                     and time.time() - swept < _CACHE_SWEEP_AGE)
+        if unchanged and offsets:
+            # Probe the last page too — additions and removals usually show there.
+            last = offsets[-1]
             try:
-                resp = api_get(ACTIVITIES_COMBINED, params={"limit": 200, "offset": offset})
-                break
-            except Exception as e:
-                if attempt < max_retries:
-                    if progress:
-                        print(f"\n  Connection error, retrying ({attempt}/{max_retries})...", flush=True)
-                    time.sleep(2 * attempt)  # backoff: 2s, 4s
-                else:
-                    if progress:
-                        print(f"\n  Failed after {max_retries} retries at offset {offset}.")
-                    # Return what we have so far rather than crash
-                    if resources:
-                        _save_cache(resources)
-                    return resources
-        page = resp.get("resources", [])
-        if not page:
-            break
-        if total is None:
-            total = resp.get("meta", {}).get("pagination", {}).get("total", 0)
-        resources.extend(page)
-        offset += len(page)
-        if progress and total:
-            print(f"\r  Scanning actions... ({min(offset, total)}/{total})", end="", flush=True)
-        if offset >= total:
-            break
+                last_page = _fetch_page(last).get("resources", [])
+            except requests.RequestException:
+                last_page = None
+            unchanged = last_page is not None and stored.get(last) == _page_fingerprint(last_page)
+        if unchanged:
+            with conn:
+                _set_meta(conn, ts=time.time())
+            if progress:
+                print(f"  Catalog unchanged ({total} actions)")
+            return conn, 0
+
+    pages, missing = _fetch_pages(offsets, progress, total, done=len(first_page))
+    pages[0] = first_page
     if progress:
         print()
+    if missing:
+        if progress:
+            fetched = sum(len(p) for p in pages.values())
+            print(f"  WARNING: {len(missing)} page(s) failed (offsets {', '.join(map(str, missing))}); "
+                  f"returning {fetched} of {total} actions without caching.")
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(":memory:")
+        _apply_pages(conn, pages, total, full=True, fresh=True)
+        return conn, len(pages)
+
+    changed = 0
+    if conn is not None:
+        try:
+            if len(_changed_pages(conn, pages)) * 2 > len(pages):
+                conn.close()  # most pages shifted — a fresh build beats patching in place
+                conn = None
+            else:
+                changed = _apply_pages(conn, pages, total, full=True)
+        except sqlite3.Error:
+            conn.close()
+            conn = None
+    if conn is None:
+        conn, changed = _save_cache(pages, total)
+    if conn is None:
+        conn = sqlite3.connect(":memory:")  # cache not writable — serve from memory
+        changed = _apply_pages(conn, pages, total, full=True, fresh=True)
+    return conn, changed
+
+
+def _spawn_background_refresh():
+    """Revalidate the cache in a detached process so this run is not blocked."""
+    try:
+        # closing() releases the handle; the connection's own context only commits
+        with contextlib.closing(sqlite3.connect(_CACHE_FILE, timeout=_DB_TIMEOUT)) as conn, conn:
+            started = float(_get_meta(conn, "refresh_started", 0))
+            if time.time() - started < 300:
+                return  # a refresh was kicked off recently
+            _set_meta(conn, refresh_started=time.time())
+        kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL,
+                  "stderr": subprocess.DEVNULL, "close_fds": True}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "--refresh-cache"], **kwargs)
+    except (OSError, sqlite3.Error, ValueError):
+        pass  # non-fatal — the next run will try again
+
+
+def _cached_catalog(progress=False):
+    """Return the catalog connection if it can be served without fetching, else None.
+
+    A stale cache is served immediately while a background process
+    revalidates it.
+    """
+    global _catalog_conn
+    if _catalog_conn is not None:
+        return _catalog_conn
+
+    conn = _open_cache()
+    age = _cache_age(conn) if conn is not None else None
+    if age is None or age >= _CACHE_MAX_STALE:
+        if conn is not None:
+            conn.close()
+        return None
+    if progress:
+        count = conn.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+        note = "< 1 hr old" if age < _CACHE_TTL else f"{int(age // 3600)} hr old, refreshing in background"
+        print(f"  Using cached catalog ({count} actions, {note})")
+    if age >= _CACHE_TTL:
+        _spawn_background_refresh()
+    _catalog_conn = conn
+    return conn
+
+
+def _catalog(progress=False):
+    """Return a connection to the full action catalog, using cache when available.
+
+    A missing or expired cache is refreshed first.
+    """
+    global _catalog_conn
+    conn = _cached_catalog(progress)
+    if conn is None:
+        conn, _ = refresh_catalog(progress)
+        _catalog_conn = conn
+    return conn
+
+
+def _load_actions(conn, ids):
+    """Decode the full JSON for *ids*, in the order given."""
+    docs = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        docs.update(conn.execute(f"SELECT id, data FROM action_docs WHERE id IN ({marks})", chunk))
+    return [json.loads(docs[aid]) for aid in ids]
+
+
+def _query_actions(where="1", params=(), conn=None):
+    """Return catalog actions matching a SQL *where* clause, in catalog order."""
+    conn = conn or _catalog(progress=True)
+    rows = conn.execute(
+        f"SELECT d.data FROM actions JOIN action_docs d USING (id) WHERE {where} ORDER BY position", params)
+    return [json.loads(data) for (data,) in rows]
+
+
+def _name_clause(term):
+    """SQL clause (and params) for a case-insensitive substring match on the name.
+
+    Terms of three or more characters are narrowed through the trigram index
+    before the substring check, so only candidate rows are examined.
+    """
+    grams = sorted(_trigrams(term))
+    if not grams:
+        return "instr(name_lower, ?) > 0", [term]
+    marks = ", ".join("?" * len(grams))
+    clause = (f"id IN (SELECT action_id FROM trigrams WHERE gram IN ({marks}) "
+              f"GROUP BY action_id HAVING COUNT(*) = ?) AND instr(name_lower, ?) > 0")
+    return clause, grams + [len(grams), term]
+
+
+def _index_search(conn, query, vendor_filter=None):
+    """Search the cached catalog.
 
-    _save_cache(resources)
-    return resources
+    Matches the whole query as a substring of the action name first, via the
+    trigram index; if that finds nothing, scans for actions whose name,
+    description or use cases contain every word of the query.
+    """
+    ql = query.lower().strip()
+    vendor_clause, vendor_params = ("vendor_lower = ? AND ", [vendor_filter.lower()]) if vendor_filter else ("", [])
+    clause, params = _name_clause(ql)
+    results = _query_actions(vendor_clause + clause, vendor_params + params, conn=conn)
+    words = ql.split()
+    if results or not words:
+        return results
+    clause = " AND ".join(["instr(search_text, ?) > 0"] * len(words))
+    return _query_actions(vendor_clause + clause, vendor_params + words, conn=conn)
 
 
 # ── Search / filter helpers ────────────────────────────────────────────────
@@ -171,35 +725,26 @@ def _paginate_all(progress=False):
 
 def list_vendors():
     """Aggregate all actions by vendor. Returns {vendor: {count, use_cases, has_permission}}."""
+    conn = _catalog(progress=True)
     vendors = {}
-    for r in _paginate_all(progress=True):
-        v = r.get("vendor", "Unknown")
-        if v not in vendors:
-            vendors[v] = {"count": 0, "use_cases": set(), "has_permission": True}
-        vendors[v]["count"] += 1
-        for uc in r.get("use_cases", []):
-            vendors[v]["use_cases"].add(uc)
-        if not r.get("has_permission", True):
-            vendors[v]["has_permission"] = False
+    for name, count, has_perm in conn.execute("SELECT name, count, has_permission FROM vendors"):
+        vendors[name] = {"count": count, "use_cases": set(), "has_permission": bool(has_perm)}
+    rows = conn.execute(
+        "SELECT DISTINCT a.vendor, u.use_case FROM use_cases u JOIN actions a ON a.id = u.action_id")
+    for vendor, uc in rows:
+        vendors[vendor]["use_cases"].add(uc)
     return vendors
 
 
 def _client_side_search(query, vendor_filter=None):
-    """Scan the cached catalog for actions matching *query* (substring, case-insensitive)."""
-    all_actions = _paginate_all(progress=True)
-    out = []
-    ql = query.lower()
-    for r in all_actions:
-        if vendor_filter and r.get("vendor", "").lower() != vendor_filter.lower():
-            continue
-        if ql in r.get("name", "").lower():
-            out.append(r)
-    return out
+    """Search the full catalog for actions matching *query* (substring, case-insensitive)."""
+    return _index_search(_catalog(progress=True), query, vendor_filter)
 
 
 def search_actions(query, vendor_filter=None):
-    """Search activities by name.  Uses FQL server-side filter first, then
-    falls back to a smart client-side filter.
+    """Search activities by name.  Answers from the cached catalog's local
+    index when a cache is available; otherwise uses the FQL server-side
+    filter first, then falls back to a smart client-side filter.
 
     FQL handles single-word queries well but returns 0 for multi-word
     substrings (e.g. "detection details").  For multi-word queries we:
@@ -207,6 +752,11 @@ def search_actions(query, vendor_filter=None):
       2. Client-side filter that small set for the full multi-word query
     This avoids the slow full-catalog scan entirely.
     """
+    # Fastest path — local index over the cached catalog, no network call
+    conn = _cached_catalog()
+    if conn is not None:
+        return _index_search(conn, query, vendor_filter)
+
     # Fast path — server-side FQL with the full query
     results = _fql_search(query, vendor_filter=vendor_filter)
     if results is not None and len(results) > 0:
@@ -227,6 +777,72 @@ def search_actions(query, vendor_filter=None):
     return _client_side_search(query, vendor_filter=vendor_filter)
 
 
+def _edit_distance(a, b, limit):
+    """Levenshtein distance between *a* and *b*, or limit + 1 if it exceeds *limit*."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _expand_term(conn, token):
+    """Return [(term, weight)] for a query token: the token itself if indexed,
+    otherwise vocabulary terms within a small edit distance (typo tolerance)."""
+    if conn.execute("SELECT 1 FROM vocab WHERE term = ?", (token,)).fetchone():
+        return [(token, 1.0)]
+    limit = 1 if len(token) <= 5 else 2
+    if len(token) < 3:
+        return []
+    rows = conn.execute("SELECT term FROM vocab WHERE length BETWEEN ? AND ?",
+                        (len(token) - limit, len(token) + limit))
+    out = []
+    for (term,) in rows:
+        distance = _edit_distance(token, term, limit)
+        if distance <= limit:
+            out.append((term, 1.0 / (1 + distance)))
+    return out
+
+
+def rank_actions(query, vendor_filter=None, top_k=10, k1=1.2, b=0.75):
+    """Return the *top_k* (None = all) most relevant actions for *query* as (score, action) pairs.
+
+    Scores are BM25 over name, vendor, use cases and description (name hits
+    weighted highest); misspelt query words are matched to indexed terms
+    within a small edit distance.  Uses the cached catalog index.
+    """
+    conn = _catalog(progress=False)
+    n_docs, avg_len = conn.execute("SELECT COUNT(*), AVG(doc_len) FROM actions").fetchone()
+    if not n_docs:
+        return []
+    avg_len = avg_len or 1.0
+    vendor = vendor_filter.lower() if vendor_filter else None
+
+    scores = {}
+    for token in set(_tokenize(query)):
+        for term, weight in _expand_term(conn, token):
+            df = conn.execute("SELECT df FROM vocab WHERE term = ?", (term,)).fetchone()[0]
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            rows = conn.execute(
+                "SELECT t.action_id, t.tf, a.doc_len, a.vendor_lower FROM terms t "
+                "JOIN actions a ON a.id = t.action_id WHERE t.term = ?", (term,))
+            for aid, tf, doc_len, action_vendor in rows:
+                if vendor and action_vendor != vendor:
+                    continue
+                norm = tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avg_len))
+                scores[aid] = scores.get(aid, 0.0) + weight * idf * norm
+
+    top = heapq.nlargest(top_k or len(scores), scores.items(), key=lambda item: item[1])
+    return list(zip([score for _, score in top], _load_actions(conn, [aid for aid, _ in top])))
+
+
 def search_by_vendor(vendor):
     """Return all actions for a specific vendor."""
     # Fast path — server-side FQL
@@ -234,21 +850,15 @@ def search_by_vendor(vendor):
     if results is not None:
         return results
 
-    # Fallback — client-side scan
-    return [r for r in _paginate_all(progress=True)
-            if r.get("vendor", "").lower() == vendor.lower()]
+    # Fallback — cached catalog (indexed by vendor)
+    return _query_actions("vendor_lower = ?", (vendor.lower(),))
 
 
 def search_by_use_case(use_case):
     """Return all actions matching a use case substring (client-side, uses cache)."""
-    ucl = use_case.lower()
-    results = []
-    for r in _paginate_all(progress=True):
-        for uc in r.get("use_cases", []):
-            if ucl in uc.lower():
-                results.append(r)
-                break
-    return results
+    return _query_actions(
+        "id IN (SELECT action_id FROM use_cases WHERE instr(use_case_lower, ?) > 0)",
+        (use_case.lower(),))
 
 
 def list_actions(limit=25, offset=0, vendor_filter=None):
@@ -263,11 +873,192 @@ def list_actions(limit=25, offset=0, vendor_filter=None):
     return resources, total
 
 
+# ── Action details ─────────────────────────────────────────────────────────
+# Full schemas (with `properties`) only come from the entities endpoint, which
+# accepts many IDs per request.  Lookups are chunked, fetched concurrently and
+# cached in their own database keyed by (action ID, version), where the
+# version is the fingerprint of the action's catalog entry — when the catalog
+# sees an action change, its cached schema stops matching.  Entries expire
+# after a TTL, the file is capped by size (least recently used go first), and
+# anything cached is served when the API cannot be reached.
+
+_DETAILS_TTL = 86400  # 1 day
+_DETAILS_CHUNK = 50
+_DETAILS_SCHEMA = 2
+_YAML_ACTION_ID = re.compile(r"^\s*id:\s*['\"]?([0-9a-fA-F]{32})['\"]?\s*(?:#.*)?$", re.MULTILINE)
+
+
+def _details_limits():
+    """(ttl seconds, max cache bytes) from CS_DETAILS_TTL / CS_DETAILS_CACHE_MB."""
+    load_env()
+    ttl = float(os.environ.get("CS_DETAILS_TTL", _DETAILS_TTL))
+    max_mb = float(os.environ.get("CS_DETAILS_CACHE_MB", "32"))
+    return ttl, int(max_mb * 1024 * 1024)
+
+
+def _open_details_cache():
+    try:
+        conn = sqlite3.connect(_DETAILS_FILE)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _DETAILS_SCHEMA:
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS details")
+                conn.execute("""CREATE TABLE details (
+                    id TEXT, version TEXT, ts REAL, atime REAL, size INTEGER, data TEXT,
+                    PRIMARY KEY (id, version))""")
+                conn.execute("CREATE INDEX details_atime ON details (atime)")
+                conn.execute(f"PRAGMA user_version = {_DETAILS_SCHEMA}")
+        return conn
+    except sqlite3.Error:
+        return None
+
+
+def _catalog_versions(ids):
+    """{id: version} for IDs present in the local catalog cache (no network)."""
+    conn = _catalog_conn or _open_cache()
+    if conn is None:
+        return {}
+    versions = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        versions.update(conn.execute(f"SELECT id, digest FROM actions WHERE id IN ({marks})", chunk))
+    if conn is not _catalog_conn:
+        conn.close()
+    return versions
+
+
+def _details_lookup(conn, aid, version, cutoff):
+    """Cached details row for an action, or None.  `cutoff=None` ignores age and version."""
+    if cutoff is None:
+        sql, params = "WHERE id = ? ORDER BY ts DESC", (aid,)
+    elif version:
+        sql, params = "WHERE id = ? AND version = ? AND ts >= ?", (aid, version, cutoff)
+    else:
+        sql, params = "WHERE id = ? AND ts >= ? ORDER BY ts DESC", (aid, cutoff)
+    return conn.execute(f"SELECT version, data FROM details {sql} LIMIT 1", params).fetchone()
+
+
+def _store_details(conn, actions, versions, max_bytes):
+    """Insert fetched details, drop superseded versions, then evict LRU entries over the size cap."""
+    now = time.time()
+    with conn:
+        for action in actions:
+            aid = action.get("id")
+            data = json.dumps(action)
+            conn.execute("DELETE FROM details WHERE id = ?", (aid,))
+            conn.execute("INSERT INTO details VALUES (?, ?, ?, ?, ?, ?)",
+                         (aid, versions.get(aid, ""), now, now, len(data), data))
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM details").fetchone()[0] - max_bytes
+        if excess > 0:
+            victims = []
+            for aid, version, size in conn.execute("SELECT id, version, size FROM details ORDER BY atime"):
+                victims.append((aid, version))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM details WHERE id = ? AND version = ?", victims)
+
+
+def _fetch_details_chunk(ids):
+    """
+    Fetch details for *ids*.  Returns (resources, errors), where errors maps
+    each ID that could not be fetched to the API's message.  An HTTP error
+    keeps whatever resources its response still carried; a chunk rejected
+    outright (400/404) is split in half until the bad IDs are isolated.
+    Connection failures and timeouts are raised.
+    """
+    try:
+        return api_get(ACTIVITIES_ENTITIES, params={"ids": ids}).get("resources", []), {}
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else 0
+        try:
+            body = e.response.json()
+        except (AttributeError, ValueError):
+            body = {}
+        resources = body.get("resources") or [] if isinstance(body, dict) else []
+        if not resources and len(ids) > 1 and status in (400, 404):
+            half = len(ids) // 2
+            left, left_errors = _fetch_details_chunk(ids[:half])
+            right, right_errors = _fetch_details_chunk(ids[half:])
+            return left + right, {**left_errors, **right_errors}
+        errs = body.get("errors") if isinstance(body, dict) else None
+        message = "; ".join(err.get("message", str(err)) for err in errs) if errs else str(e)
+        got = {r.get("id") for r in resources}
+        return resources, {aid: message for aid in ids if aid not in got}
+
+
+def get_actions_details(action_ids):
+    """Get full details for many action IDs.  Returns {id: action} for those found."""
+    ids = list(dict.fromkeys(action_ids))
+    ttl, max_bytes = _details_limits()
+    versions = _catalog_versions(ids)
+    found = {}
+    conn = _open_details_cache()
+    if conn is not None:
+        cutoff = time.time() - ttl
+        hits = []
+        for aid in ids:
+            row = _details_lookup(conn, aid, versions.get(aid), cutoff)
+            if row:
+                found[aid] = json.loads(row[1])
+                hits.append((time.time(), aid, row[0]))
+        try:
+            with conn:
+                conn.executemany("UPDATE details SET atime = ? WHERE id = ? AND version = ?", hits)
+        except sqlite3.Error:
+            pass
+
+    missing = [aid for aid in ids if aid not in found]
+    chunks = [missing[i:i + _DETAILS_CHUNK] for i in range(0, len(missing), _DETAILS_CHUNK)]
+    fetched, failed = [], {}
+    try:
+        if chunks:
+            load_env()  # nothing has called the API yet, so .env may not be loaded
+            workers = int(os.environ.get("CS_PAGE_WORKERS", "8"))
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+                for resources, errors in pool.map(_fetch_details_chunk, chunks):
+                    fetched.extend(resources)
+                    failed.update(errors)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        # Offline: fall back to whatever is cached, however old
+        stale = {}
+        if conn is not None:
+            for aid in missing:
+                row = _details_lookup(conn, aid, None, None)
+                if row:
+                    stale[aid] = json.loads(row[1])
+            conn.close()
+        if len(stale) < len(missing):
+            raise
+        print(f"  API unavailable ({e}); using cached details.", file=sys.stderr)
+        found.update(stale)
+        return found
+
+    for action in fetched:
+        found[action.get("id")] = action
+    failed = {aid: msg for aid, msg in failed.items() if aid not in found}
+    if failed:
+        print(f"  WARNING: could not fetch details for {len(failed)} action(s):", file=sys.stderr)
+        for aid, msg in failed.items():
+            print(f"    {aid}: {msg}", file=sys.stderr)
+    if conn is not None:
+        try:
+            _store_details(conn, fetched, versions, max_bytes)
+        except sqlite3.Error:
+            pass  # non-fatal — next lookup will just re-fetch
+        conn.close()
+    return found
+
+
 def get_action_details(action_id):
     """Get full details for a specific action by ID."""
-    resp = api_get(ACTIVITIES_ENTITIES, params={"ids": action_id})
-    resources = resp.get("resources", [])
-    return resources[0] if resources else None
+    return get_actions_details([action_id]).get(action_id)
+
+
+def extract_action_ids_from_yaml(file_path):
+    """Return the catalog action IDs (32-char hex `id:` values) in a workflow YAML, in order."""
+    with open(file_path, encoding="utf-8") as f:
+        return list(dict.fromkeys(m.lower() for m in _YAML_ACTION_ID.findall(f.read())))
 
 
 # ── Formatting ─────────────────────────────────────────────────────────────
@@ -343,7 +1134,7 @@ def format_vendors_table(vendors):
     lines = []
     lines.append(f"\nAvailable integrations ({total_vendors} vendors, {total_actions} actions):\n")
     lines.append(f"  {'Vendor':<35} {'Actions':>7}  Use Cases")
-    lines.append(f"  {'\u2500' * 75}")
+    lines.append("  " + "\u2500" * 75)
 
     # Sort by action count descending
     for name, info in sorted(vendors.items(), key=lambda x: x[1]["count"], reverse=True):
@@ -364,22 +1155,28 @@ def main():
     parser = argparse.ArgumentParser(description="Search CrowdStrike Fusion actions")
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--search", "-s", metavar="QUERY", help="Search actions by name")
-    group.add_argument("--details", "-d", metavar="ID", help="Show full details for an action ID")
+    group.add_argument("--details", "-d", metavar="ID", nargs="+", help="Show full details for action ID(s)")
+    group.add_argument("--from-yaml", metavar="FILE",
+                       help="Show full details for every action ID referenced in a workflow YAML")
     group.add_argument("--list", "-l", action="store_true", help="List actions (paginated)")
     group.add_argument("--vendors", action="store_true", help="List all available vendors/integrations")
+    group.add_argument("--refresh-cache", action="store_true",
+                       help="Revalidate the local action cache, refetching only changed pages")
     group.add_argument("--clear-cache", action="store_true", help="Clear the local action cache")
     parser.add_argument("--vendor", metavar="NAME", help="Filter to a specific vendor")
     parser.add_argument("--use-case", metavar="TERM", help="Filter by use case")
+    parser.add_argument("--ranked", action="store_true",
+                        help="Rank --search results by relevance (typo-tolerant); shows top --limit")
     parser.add_argument("--limit", type=int, default=25, help="Results per page (default: 25)")
     parser.add_argument("--offset", type=int, default=0, help="Pagination offset")
     parser.add_argument("--json", action="store_true", help="Machine-readable JSON output")
     args = parser.parse_args()
 
     # Require at least one mode of operation
-    if not any([args.search, args.details, args.list, args.vendors, args.vendor,
-                args.use_case, args.clear_cache]):
-        parser.error("one of --search, --details, --list, --vendors, --vendor, "
-                     "--use-case, or --clear-cache is required")
+    if not any([args.search, args.details, args.from_yaml, args.list, args.vendors, args.vendor,
+                args.use_case, args.refresh_cache, args.clear_cache]):
+        parser.error("one of --search, --details, --from-yaml, --list, --vendors, --vendor, "
+                     "--use-case, --refresh-cache, or --clear-cache is required")
 
     if args.clear_cache:
         if _clear_cache():
@@ -388,6 +1185,12 @@ def main():
             print("No cache file found.")
         return
 
+    if args.refresh_cache:
+        conn, changed = refresh_catalog(progress=True)
+        count = conn.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+        print(f"Catalog refreshed: {count} actions, {changed} page(s) rewritten.")
+        return
+
     if args.vendors:
         vendors = list_vendors()
         if args.use_case:
@@ -432,6 +1235,25 @@ def main():
                 print(format_action_summary(r))
                 print()
 
+    elif args.search and args.ranked:
+        # With --use-case, rank everything first so the filter cannot empty the top-k
+        ranked = rank_actions(args.search, vendor_filter=args.vendor,
+                              top_k=None if args.use_case else args.limit)
+        if args.use_case:
+            ranked = [(score, r) for score, r in ranked if any(
+                args.use_case.lower() in uc.lower() for uc in r.get("use_cases", [])
+            )][:args.limit]
+        if args.json:
+            print(json.dumps([dict(r, score=round(score, 3)) for score, r in ranked], indent=2))
+        elif not ranked:
+            print(f"No actions matching '{args.search}'.")
+        else:
+            print(f"\nTop {len(ranked)} action(s) for '{args.search}':\n")
+            for score, r in ranked:
+                print(format_action_summary(r))
+                print(f"    Score    : {score:.2f}")
+                print()
+
     elif args.search:
         results = search_actions(args.search, vendor_filter=args.vendor)
         if args.use_case:
@@ -448,18 +1270,35 @@ def main():
                 print(format_action_summary(r))
                 print()
 
-    elif args.details:
-        action = get_action_details(args.details)
+    elif args.details and len(args.details) == 1:
+        action = get_action_details(args.details[0])
         if args.json:
             print(json.dumps(action, indent=2))
         elif not action:
-            print(f"Action '{args.details}' not found.")
+            print(f"Action '{args.details[0]}' not found.")
             sys.exit(1)
         else:
             print(f"\nAction details:\n")
             print(format_action_details(action))
             print()
 
+    elif args.details or args.from_yaml:
+        ids = args.details or extract_action_ids_from_yaml(args.from_yaml)
+        found = get_actions_details(ids)
+        not_found = [aid for aid in ids if aid not in found]
+        if args.json:
+            print(json.dumps([found[aid] for aid in ids if aid in found], indent=2))
+        else:
+            print(f"\nAction details ({len(found)} of {len(ids)} found):\n")
+            for aid in ids:
+                if aid in found:
+                    print(format_action_details(found[aid]))
+                    print()
+            for aid in not_found:
+                print(f"Action '{aid}' not found.")
+        if not_found:
+            sys.exit(1)
+
     elif args.list:
         if args.use_case:
             # --list --use-case: filter by use case
@@ -0,0 +1,108 @@
+"""
+Asyncio counterparts of the cs_auth HTTP helpers, for fanning out many
+requests from one script:
+
+    import asyncio
+    from cs_async import api_get
+
+    async def fetch_all(ids):
+        return await asyncio.gather(*(api_get(PATH, {"id": i}) for i in ids))
+
+    results = asyncio.run(fetch_all(ids))
+
+Each HTTP attempt runs on a bounded worker pool over the shared cs_auth
+session, so token caching, rate limiting, retries and connection pooling
+behave exactly as for the synchronous helpers. Retry backoff is awaited on
+the event loop instead of holding a worker, so hundreds of coroutines can be
+pending while at most CS_ASYNC_WORKERS requests are on the wire.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cs_auth import load_env, get_config, invalidate_token, RetryState
+
+
+# ── Worker pool ─────────────────────────────────────────────────────────────
+# Size it no larger than CS_POOL_MAXSIZE so every worker can hold a pooled
+# connection instead of opening a throwaway one.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                load_env()
+                workers = int(os.environ.get("CS_ASYNC_WORKERS", "16"))
+                _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="cs-async")
+    return _executor
+
+
+# ── Requests ────────────────────────────────────────────────────────────────
+
+async def _send(method, url, idempotent, **kwargs):
+    """
+    Async version of cs_auth._send, driven by the same cs_auth.RetryState but
+    with non-blocking backoff. Attempts and token fetches run on the worker
+    threads, so the single-flight refresh in cs_auth never blocks the loop.
+    """
+    loop = asyncio.get_running_loop()
+    state = RetryState(method, url, idempotent, **kwargs)
+    while True:
+        try:
+            resp = await loop.run_in_executor(get_executor(), state.send_once)
+        except requests.exceptions.RequestException as e:
+            action, value = state.next_step(exc=e)
+        else:
+            action, value = state.next_step(resp)
+        if action == "done":
+            return value
+        if action == "reauth":
+            await loop.run_in_executor(get_executor(), invalidate_token, value)
+        else:
+            await asyncio.sleep(value)
+
+
+async def api_request(method, path, idempotent=None, **kwargs):
+    """
+    Send an authenticated request through the shared session.
+    Returns the raw requests.Response. idempotent defaults as in cs_auth.
+    """
+    if idempotent is None:
+        idempotent = method.upper() != "POST"
+    return await _send(method, f"{get_config().base_url}{path}", idempotent, **kwargs)
+
+
+async def api_get(path, params=None):
+    """GET request with Bearer auth. Returns parsed JSON."""
+    return (await api_request("GET", path, params=params)).json()
+
+
+async def api_post(path, json_body=None, params=None, idempotent=False):
+    """POST request with JSON body and Bearer auth. Returns parsed JSON."""
+    resp = await api_request("POST", path, idempotent=idempotent, json=json_body, params=params)
+    return resp.json()
+
+
+async def api_post_multipart(path, file_path, params=None, idempotent=False):
+    """
+    POST multipart/form-data with a YAML file upload (field name 'data_file').
+    Returns parsed JSON.
+    """
+    filename = os.path.basename(file_path)
+    with open(file_path, "rb") as f:
+        content = f.read()  # read up front so a retried request can be resent
+    files = {"data_file": (filename, content, "application/x-yaml")}
+    resp = await api_request("POST", path, idempotent=idempotent, files=files, params=params)
+    return resp.json()
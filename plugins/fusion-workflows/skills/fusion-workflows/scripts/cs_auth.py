@@ -11,23 +11,29 @@ import os
 import sys
 import json
 import time
+import hashlib
+import tempfile
+import threading
+import contextlib
+import email.utils
+import random
 import requests
+from requests.adapters import HTTPAdapter
 
 # Fix Windows console encoding
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 
 # ── .env loader ─────────────────────────────────────────────────────────────
+# The .env path is resolved once per process and the file is re-read only when
+# its mtime changes, so helpers can call load_env() on every request for the
+# cost of one stat().
 
-def load_env(env_file=None):
-    """
-    Load key=value pairs from a .env file into os.environ.
+_UNRESOLVED = object()
+_env_lock = threading.Lock()
+_env_state = {"source": _UNRESOLVED, "path": None, "mtime": None, "keys": set()}
 
-    Resolution order for the .env path:
-      1. Explicit env_file argument
-      2. CS_ENV_FILE environment variable
-      3. Walk upward from this script's directory to find '.env'
-      4. Fall back to the project root (workflows/)
-    """
+
+def _find_env_file(env_file):
     if env_file is None:
         env_file = os.environ.get("CS_ENV_FILE")
 
@@ -42,56 +48,220 @@ def load_env(env_file=None):
             if parent == search:
                 break
             search = parent
+    return env_file
 
-    if env_file is None or not os.path.isfile(env_file):
-        return  # No .env found; rely on existing environment variables
 
-    with open(env_file, encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if "=" not in line:
-                continue
-            key, _, value = line.partition("=")
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            os.environ.setdefault(key, value)
+def load_env(env_file=None):
+    """
+    Load key=value pairs from a .env file into os.environ.
+
+    Resolution order for the .env path:
+      1. Explicit env_file argument
+      2. CS_ENV_FILE environment variable
+      3. Walk upward from this script's directory to find '.env'
+      4. Fall back to the project root (workflows/)
+
+    Variables already set in the environment win over the file. When the
+    file changes, the values it supplied are refreshed.
+    """
+    source = env_file if env_file is not None else os.environ.get("CS_ENV_FILE")
+    with _env_lock:
+        state = _env_state
+        if state["source"] is _UNRESOLVED or state["source"] != source:
+            state.update(source=source, path=_find_env_file(env_file), mtime=None)
+
+        try:
+            mtime = os.stat(state["path"]).st_mtime_ns if state["path"] else None
+        except OSError:
+            mtime = None
+        if mtime is None or mtime == state["mtime"]:
+            return  # No .env found (rely on existing environment variables) or unchanged
+
+        with open(state["path"], encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if "=" not in line:
+                    continue
+                key, _, value = line.partition("=")
+                key = key.strip()
+                value = value.strip().strip('"').strip("'")
+                if key in state["keys"] or key not in os.environ:
+                    os.environ[key] = value
+                    state["keys"].add(key)
+        state["mtime"] = mtime
+
+
+# ── File helpers ────────────────────────────────────────────────────────────
+
+@contextlib.contextmanager
+def file_lock(path, blocking=True):
+    """
+    Hold an exclusive cross-process lock on *path* (created if missing).
+
+    With blocking=False, yields False immediately if another process holds
+    the lock instead of waiting; otherwise yields True once acquired.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    locked = False
+    try:
+        if os.name == "nt":
+            import msvcrt
+            mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+            while not locked:
+                try:
+                    msvcrt.locking(fd, mode, 1)
+                    locked = True
+                except OSError:
+                    if not blocking:
+                        break
+        else:
+            import fcntl
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                locked = True
+            except BlockingIOError:
+                pass
+        yield locked
+    finally:
+        if locked:
+            if os.name == "nt":
+                import msvcrt
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def atomic_write(path, data, mode=0o600):
+    """
+    Write *data* (str or bytes) to *path* via a temp file + rename, so readers
+    never observe a partially written file. The file is created with *mode*.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
 
 
 # ── Credentials ─────────────────────────────────────────────────────────────
 
+class Config:
+    """Connection settings resolved from .env and the environment."""
+
+    def __init__(self, client_id, client_secret, base_url):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip("/")
+
+
+_config = {"key": None, "config": None}
+
+
+def get_config():
+    """
+    Return the current Config. It is rebuilt only when the .env file or the
+    CS_CLIENT_ID / CS_CLIENT_SECRET / CS_BASE_URL variables change.
+    """
+    load_env()
+    key = (os.environ.get("CS_CLIENT_ID", ""), os.environ.get("CS_CLIENT_SECRET", ""),
+           os.environ.get("CS_BASE_URL", "https://api.crowdstrike.com"))
+    if _config["key"] != key:
+        _config.update(key=key, config=Config(*key))
+    return _config["config"]
+
+
 def get_credentials():
     """Return (client_id, client_secret, base_url) from environment."""
-    load_env()
-    client_id = os.environ.get("CS_CLIENT_ID", "")
-    client_secret = os.environ.get("CS_CLIENT_SECRET", "")
-    base_url = os.environ.get("CS_BASE_URL", "https://api.crowdstrike.com")
-    if not client_id or not client_secret:
+    config = get_config()
+    if not config.client_id or not config.client_secret:
         print("ERROR: CS_CLIENT_ID and CS_CLIENT_SECRET must be set in .env or environment.", file=sys.stderr)
         sys.exit(1)
-    return client_id, client_secret, base_url.rstrip("/")
+    return config.client_id, config.client_secret, config.base_url
 
 
-# ── Token cache ─────────────────────────────────────────────────────────────
-
-_token_cache = {"token": None, "expires": 0}
+def tenant_key():
+    """Short stable key for the configured API client and cloud (for per-tenant caches)."""
+    client_id, _, base_url = get_credentials()
+    return hashlib.sha256(f"{client_id}|{base_url}".encode("utf-8")).hexdigest()[:16]
 
 
-def get_token(client_id=None, client_secret=None, base_url=None):
+# ── Token cache ─────────────────────────────────────────────────────────────
+# Tokens are cached in-process and, unless disabled, in a per-user file shared
+# by every script invocation so consecutive CLI runs reuse a live token instead
+# of paying an /oauth2/token round trip. Set CS_TOKEN_CACHE to a file path to
+# relocate the cache, or to "off" to disable it.
+#
+# Refreshes are single-flight: one thread fetches while the others wait and
+# reuse its token. Within CS_TOKEN_REFRESH_AHEAD seconds of expiry (capped at
+# half the token's lifetime, so short-lived tokens do not trigger a refresh on
+# every call) the current token is still handed out while a background thread
+# renews it, so long polls never stall on a token round trip. A token rejected
+# with 401 is invalidated
+# and the request replayed once (see _send).
+#
+# Like the file, the in-process cache is keyed by client ID and cloud, so a
+# .env switched to another tenant mid-process never reuses the old token.
+
+_token_cache = {}  # _token_cache_key() -> (token, expires_at, refresh_at)
+_token_lock = threading.Lock()
+
+
+def cache_file(env_var, filename):
     """
-    Obtain an OAuth2 bearer token via client_credentials grant.
-    Caches the token until 60 s before expiry.
+    Return the path of a per-user cache file, or None if disabled.
+    *env_var* may name another path, or "off" to disable; the default is
+    <XDG_CACHE_HOME or ~/.cache>/cs-fusion/<filename>.
     """
-    now = time.time()
-    if _token_cache["token"] and now < _token_cache["expires"]:
-        return _token_cache["token"]
+    load_env()
+    path = os.environ.get(env_var, "")
+    if path.lower() in ("0", "off", "none", "false"):
+        return None
+    if not path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "cs-fusion", filename)
+    return path
 
-    if client_id is None:
-        client_id, client_secret, base_url = get_credentials()
 
-    resp = requests.post(
+def _token_cache_path():
+    """Return the on-disk token cache path, or None if disabled."""
+    return cache_file("CS_TOKEN_CACHE", "tokens.json")
+
+
+def _token_cache_key(client_id, base_url):
+    return hashlib.sha256(f"{client_id}|{base_url}".encode("utf-8")).hexdigest()
+
+
+def _read_token_file(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _request_token(client_id, client_secret, base_url):
+    """POST the client_credentials grant. Returns (token, issued_at, expires_at)."""
+    now = time.time()
+    resp = _send(
+        "POST",
         f"{base_url}/oauth2/token",
+        idempotent=True,
+        auth=False,
         data={
             "client_id": client_id,
             "client_secret": client_secret,
@@ -99,53 +269,555 @@ def get_token(client_id=None, client_secret=None, base_url=None):
         },
         headers={"Content-Type": "application/x-www-form-urlencoded"},
     )
-    resp.raise_for_status()
     body = resp.json()
+    return body["access_token"], now, now + body.get("expires_in", 1799) - 60
+
+
+def _refresh_at(issued, expires):
+    """
+    When to start renewing a token: CS_TOKEN_REFRESH_AHEAD seconds before it
+    expires, but no earlier than halfway through its lifetime.
+    """
+    load_env()
+    ahead = float(os.environ.get("CS_TOKEN_REFRESH_AHEAD", "300"))
+    return expires - min(ahead, (expires - issued) / 2)
+
+
+def _fetch_token_shared(client_id, client_secret, base_url, path):
+    """
+    Return a token from the on-disk cache, fetching and storing a new one if
+    needed. The lock makes concurrent processes wait for one fetch and reuse it.
+    Cached tokens already inside the refresh-ahead window are not reused.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+    key = _token_cache_key(client_id, base_url)
+    with file_lock(path + ".lock"):
+        entries = _read_token_file(path)
+        now = time.time()
+        entry = entries.get(key)
+        if entry and now < _refresh_at(entry.get("issued", 0), entry.get("expires", 0)):
+            return entry["token"], entry.get("issued", 0), entry["expires"]
+
+        token, issued, expires = _request_token(client_id, client_secret, base_url)
+        entries = {k: v for k, v in entries.items() if v.get("expires", 0) > now}
+        entries[key] = {"token": token, "issued": issued, "expires": expires}
+        try:
+            atomic_write(path, json.dumps(entries))
+        except OSError:
+            pass  # non-fatal — the token is still cached in-process
+        return token, issued, expires
+
+
+def _refresh_token(client_id, client_secret, base_url):
+    """Fetch a new token into the in-process cache. Caller holds _token_lock."""
+    path = _token_cache_path()
+    token = None
+    if path:
+        try:
+            token, issued, expires = _fetch_token_shared(client_id, client_secret, base_url, path)
+        except OSError:
+            token = None  # unusable cache location — fall back to a direct fetch
+    if token is None:
+        token, issued, expires = _request_token(client_id, client_secret, base_url)
+
+    _token_cache[_token_cache_key(client_id, base_url)] = (token, expires, _refresh_at(issued, expires))
+    return token
+
+
+def _start_background_refresh(client_id, client_secret, base_url):
+    """Renew the token on a daemon thread unless a refresh is already running."""
+    if not _token_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            _, _, refresh_at = _token_cache.get(_token_cache_key(client_id, base_url), (None, 0, 0))
+            if time.time() >= refresh_at:
+                _refresh_token(client_id, client_secret, base_url)
+        except Exception:
+            pass  # non-fatal — callers fetch synchronously once the token expires
+        finally:
+            _token_lock.release()
+
+    threading.Thread(target=run, name="cs-token-refresh", daemon=True).start()
+
+
+def get_token(client_id=None, client_secret=None, base_url=None):
+    """
+    Obtain an OAuth2 bearer token via client_credentials grant.
+    Caches the token (in-process and on disk) until 60 s before expiry and
+    renews it in the background shortly before that.
+    """
+    if client_id is None:
+        client_id, client_secret, base_url = get_credentials()
+    key = _token_cache_key(client_id, base_url)
+    token, expires, refresh_at = _token_cache.get(key, (None, 0, 0))
+    now = time.time()
+    if token and now < expires:
+        if now >= refresh_at:
+            _start_background_refresh(client_id, client_secret, base_url)
+        return token
+
+    with _token_lock:
+        token, expires, _ = _token_cache.get(key, (None, 0, 0))
+        if token and time.time() < expires:
+            return token  # another thread refreshed while we waited
+        return _refresh_token(client_id, client_secret, base_url)
+
 
-    _token_cache["token"] = body["access_token"]
-    _token_cache["expires"] = now + body.get("expires_in", 1799) - 60
-    return _token_cache["token"]
+def invalidate_token(token):
+    """
+    Forget *token* (e.g. after the API rejected it with 401) in-process and in
+    the on-disk cache, so the next get_token() fetches a fresh one. A no-op if
+    another thread has already replaced it.
+    """
+    with _token_lock:
+        path = _token_cache_path()
+        if path and os.path.exists(path):
+            try:
+                with file_lock(path + ".lock"):
+                    entries = _read_token_file(path)
+                    kept = {k: v for k, v in entries.items() if v.get("token") != token}
+                    if kept != entries:
+                        atomic_write(path, json.dumps(kept))
+            except OSError:
+                pass
+        for key, (cached, _, _) in list(_token_cache.items()):
+            if cached == token:
+                del _token_cache[key]
+
+
+# ── HTTP session ────────────────────────────────────────────────────────────
+# A single requests.Session is shared by every helper so TCP/TLS connections to
+# the API host are kept alive and reused instead of re-handshaking per call.
+# Pool sizing can be tuned via environment variables or configure_session().
+
+_session = None
+_session_lock = threading.Lock()
+_pool_overrides = {}
+
+
+def _pool_config():
+    """Resolve pool settings: configure_session() overrides, then env, then defaults."""
+    load_env()
+    config = {
+        "pool_connections": int(os.environ.get("CS_POOL_CONNECTIONS", "4")),
+        "pool_maxsize": int(os.environ.get("CS_POOL_MAXSIZE", "16")),
+        "pool_block": os.environ.get("CS_POOL_BLOCK", "").lower() in ("1", "true", "yes"),
+    }
+    config.update(_pool_overrides)
+    return config
+
+
+def configure_session(pool_connections=None, pool_maxsize=None, pool_block=None):
+    """
+    Adjust connection-pool settings for the shared session.
+
+      pool_connections — number of per-host pools to keep (distinct hosts)
+      pool_maxsize     — max keep-alive connections per host
+      pool_block       — block when the per-host pool is exhausted instead of
+                         opening throwaway connections
+
+    Any existing session is closed and rebuilt on next use.
+    """
+    global _session
+    with _session_lock:
+        if pool_connections is not None:
+            _pool_overrides["pool_connections"] = pool_connections
+        if pool_maxsize is not None:
+            _pool_overrides["pool_maxsize"] = pool_maxsize
+        if pool_block is not None:
+            _pool_overrides["pool_block"] = pool_block
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session():
+    """Return the shared, connection-pooled requests.Session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(**_pool_config())
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["Connection"] = "keep-alive"
+                _session = session
+    return _session
+
+
+# ── Timeouts and deadlines ──────────────────────────────────────────────────
+# Every attempt gets a connect and a read timeout (CS_CONNECT_TIMEOUT,
+# CS_READ_TIMEOUT) so a stalled connection cannot hang a worker. On top of
+# that, a process-wide deadline (CS_DEADLINE seconds, or set_deadline()) bounds
+# the whole command: rate-limit waits, retries, pagination and polling stop
+# with DeadlineExceeded once it has passed.
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The command's overall deadline passed before the request could finish."""
+
+
+_deadline = {"at": None, "loaded": False}
+
+
+def set_deadline(seconds):
+    """Give the rest of this process *seconds* to finish (None removes the limit)."""
+    _deadline["at"] = None if seconds is None else time.monotonic() + seconds
+    _deadline["loaded"] = True
+
+
+def deadline_remaining():
+    """Seconds left before the deadline, or None if there is none."""
+    if not _deadline["loaded"]:
+        load_env()
+        value = os.environ.get("CS_DEADLINE", "")
+        set_deadline(float(value) if value else None)
+    if _deadline["at"] is None:
+        return None
+    return _deadline["at"] - time.monotonic()
+
+
+def check_deadline(wait=0):
+    """Raise DeadlineExceeded if the deadline passes within *wait* seconds."""
+    remaining = deadline_remaining()
+    if remaining is not None and remaining <= wait:
+        raise DeadlineExceeded("deadline exceeded")
+
+
+def _before_deadline(wait):
+    """True if sleeping *wait* seconds still leaves time before the deadline."""
+    remaining = deadline_remaining()
+    return remaining is None or wait < remaining
+
+
+def _request_timeout():
+    """Return the (connect, read) timeout for one attempt, capped by the deadline."""
+    load_env()
+    connect = float(os.environ.get("CS_CONNECT_TIMEOUT", "10"))
+    read = float(os.environ.get("CS_READ_TIMEOUT", "60"))
+    remaining = deadline_remaining()
+    if remaining is not None:
+        connect, read = min(connect, remaining), min(read, remaining)
+    return connect, read
+
+
+# ── Rate limiting ───────────────────────────────────────────────────────────
+# CrowdStrike allows 6,000 requests/minute per CID. A token bucket paces every
+# helper to that budget (CS_RATE_LIMIT per minute, CS_RATE_BURST tokens) and
+# absorbs the server's X-RateLimit-Remaining / Retry-After hints, so bulk runs
+# slow down instead of failing with 429. The bucket is shared by all threads;
+# set CS_RATE_LIMIT_FILE to also share it between processes.
+
+def _retry_after_seconds(resp):
+    """Return the server-requested wait in seconds, or None if not given."""
+    value = resp.headers.get("X-RateLimit-RetryAfter")
+    if value:
+        try:
+            return max(0.0, float(value) - time.time())  # epoch seconds
+        except ValueError:
+            pass
+    value = resp.headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)  # HTTP-date form
+        except (TypeError, ValueError):
+            return None  # malformed header — fall back to normal backoff
+        if parsed is not None:
+            return max(0.0, parsed.timestamp() - time.time())
+    return None
+
+
+class RateLimiter:
+    """
+    Token bucket refilled at *per_minute* / 60 tokens per second, holding at
+    most *burst* tokens. If *state_file* is given the bucket state lives in that
+    file (guarded by file_lock) so separate processes draw from one budget.
+    """
+
+    def __init__(self, per_minute=6000, burst=100, state_file=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._state = {"tokens": self.capacity, "updated": time.time(), "blocked_until": 0.0}
+
+    @contextlib.contextmanager
+    def _locked_state(self):
+        with self._lock:
+            if not self.state_file:
+                yield self._state
+                return
+            with file_lock(self.state_file + ".lock"):
+                try:
+                    with open(self.state_file, encoding="utf-8") as f:
+                        self._state.update(json.load(f))
+                except (OSError, ValueError):
+                    pass
+                yield self._state
+                try:
+                    with open(self.state_file, "w", encoding="utf-8") as f:
+                        json.dump(self._state, f)
+                except OSError:
+                    pass
+
+    def _refill(self, state, now):
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(self.capacity, state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+
+    def acquire(self):
+        """
+        Block until a request may be sent, then consume one token.
+        Raises DeadlineExceeded instead of waiting past the deadline.
+        """
+        while True:
+            with self._locked_state() as state:
+                now = time.time()
+                self._refill(state, now)
+                if now < state["blocked_until"]:
+                    wait = state["blocked_until"] - now
+                elif state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    return
+                else:
+                    wait = (1 - state["tokens"]) / self.rate
+            check_deadline(wait)
+            time.sleep(wait)
+
+    def observe(self, resp):
+        """Fold the server's rate-limit headers from *resp* into the bucket."""
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        retry_after = _retry_after_seconds(resp) if resp.status_code == 429 else None
+        if remaining is None and retry_after is None and resp.status_code != 429:
+            return
+        with self._locked_state() as state:
+            now = time.time()
+            self._refill(state, now)
+            if remaining is not None:
+                try:
+                    state["tokens"] = min(state["tokens"], float(remaining))
+                except ValueError:
+                    pass
+            if resp.status_code == 429:
+                wait = retry_after if retry_after is not None else 60.0 / self.rate
+                state["tokens"] = 0.0
+                state["blocked_until"] = max(state["blocked_until"], now + wait)
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter():
+    """Return the process-wide RateLimiter, built from the environment."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _session_lock:
+            if _rate_limiter is None:
+                load_env()
+                _rate_limiter = RateLimiter(
+                    per_minute=float(os.environ.get("CS_RATE_LIMIT", "6000")),
+                    burst=int(os.environ.get("CS_RATE_BURST", "100")),
+                    state_file=os.environ.get("CS_RATE_LIMIT_FILE") or None,
+                )
+    return _rate_limiter
+
+
+# ── Retry policy ────────────────────────────────────────────────────────────
+# One policy for every helper: exponential backoff with full jitter on 429,
+# 5xx and connection errors. Non-idempotent POSTs (import, execute) are only
+# retried when the request provably was not processed — a 429 rejection or a
+# failure to connect — so a retry can never create a duplicate workflow or run.
+# Tune with CS_RETRY_MAX (attempts) and CS_RETRY_BACKOFF (base seconds).
+
+class RetryPolicy:
+    """Decide whether and how long to wait before re-sending a failed request."""
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, max_attempts=5, backoff=1.0, max_backoff=30.0):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt, resp=None):
+        """Seconds to sleep after failed *attempt* (1-based)."""
+        wait = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        if resp is not None and resp.status_code != 429:
+            # 429 waits are enforced by the rate limiter; honour hints on 5xx here.
+            hinted = _retry_after_seconds(resp)
+            if hinted is not None:
+                wait = max(wait, min(hinted, self.max_backoff))
+        return wait
+
+    def should_retry_response(self, resp, idempotent):
+        if resp.status_code == 429:
+            return True
+        return idempotent and resp.status_code in self.RETRY_STATUSES
+
+    def should_retry_error(self, exc, idempotent):
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return True  # never reached the server
+        return idempotent and isinstance(exc, (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ))
+
+
+_retry_policy = None
+
+
+def get_retry_policy():
+    """Return the process-wide RetryPolicy, built from the environment."""
+    global _retry_policy
+    if _retry_policy is None:
+        load_env()
+        _retry_policy = RetryPolicy(
+            max_attempts=int(os.environ.get("CS_RETRY_MAX", "5")),
+            backoff=float(os.environ.get("CS_RETRY_BACKOFF", "1.0")),
+        )
+    return _retry_policy
+
+
+def _attempt(method, url, auth=True, headers=None, **kwargs):
+    """Make a single rate-limited HTTP attempt (no retries). Returns the Response."""
+    check_deadline()
+    kwargs.setdefault("timeout", _request_timeout())
+    limiter = get_rate_limiter()
+    limiter.acquire()
+    all_headers = _headers() if auth else {}
+    all_headers.update(headers or {})
+    resp = get_session().request(method, url, headers=all_headers, **kwargs)
+    limiter.observe(resp)
+    return resp
+
+
+def _sent_token(resp):
+    """Return the bearer token a response's request was sent with."""
+    return resp.request.headers.get("Authorization", "")[len("Bearer "):]
+
+
+class RetryState:
+    """
+    Retry bookkeeping for one logical request. _send and cs_async._send both
+    drive it, so they share one set of retry, 401-replay and deadline rules
+    and differ only in how they block and sleep.
+    """
+
+    def __init__(self, method, url, idempotent, auth=True, **kwargs):
+        self.method = method
+        self.url = url
+        self.idempotent = idempotent
+        self.auth = auth
+        self.kwargs = kwargs
+        self.policy = get_retry_policy()
+        self.attempt = 0
+        self.reauthed = False
+
+    def send_once(self):
+        """Make the next HTTP attempt (blocking). Returns the Response."""
+        self.attempt += 1
+        return _attempt(self.method, self.url, self.auth, **self.kwargs)
+
+    def next_step(self, resp=None, exc=None):
+        """
+        Decide what follows an attempt that returned *resp* or raised *exc*:
+        ("sleep", seconds) then send again, ("reauth", token) to invalidate
+        that token and send again, or ("done", resp). Raises once the request
+        has failed for good.
+        """
+        policy = self.policy
+        if exc is not None:
+            if (isinstance(exc, DeadlineExceeded) or self.attempt >= policy.max_attempts
+                    or not policy.should_retry_error(exc, self.idempotent)):
+                raise exc
+            wait = policy.delay(self.attempt)
+            check_deadline(wait)
+            return "sleep", wait
+        if resp.status_code == 401 and self.auth and not self.reauthed:
+            self.reauthed = True
+            self.attempt -= 1  # the replay does not count as a retry
+            return "reauth", _sent_token(resp)
+        if self.attempt < policy.max_attempts and policy.should_retry_response(resp, self.idempotent):
+            wait = policy.delay(self.attempt, resp)
+            if _before_deadline(wait):
+                return "sleep", wait
+        resp.raise_for_status()
+        return "done", resp
+
+
+def _send(method, url, idempotent, auth=True, **kwargs):
+    """
+    Send one logical request with rate limiting and retries applied.
+    Returns the final requests.Response (raise_for_status already called).
+    A 401 on an authenticated request re-authenticates and replays it once;
+    the request was rejected before processing, so this is safe for any method.
+    """
+    state = RetryState(method, url, idempotent, auth, **kwargs)
+    while True:
+        try:
+            resp = state.send_once()
+        except requests.exceptions.RequestException as e:
+            action, value = state.next_step(exc=e)
+        else:
+            action, value = state.next_step(resp)
+        if action == "done":
+            return value
+        if action == "reauth":
+            invalidate_token(value)
+        else:
+            time.sleep(value)
 
 
 # ── HTTP helpers ────────────────────────────────────────────────────────────
 
 def _base_url():
-    load_env()
-    return os.environ.get("CS_BASE_URL", "https://api.crowdstrike.com").rstrip("/")
+    return get_config().base_url
 
 
 def _headers():
     return {"Authorization": f"Bearer {get_token()}"}
 
 
+def api_request(method, path, idempotent=None, **kwargs):
+    """
+    Send an authenticated request through the shared session.
+    Returns the raw requests.Response (for non-JSON endpoints such as export).
+
+    idempotent defaults to True for every method except POST; pass True for
+    POSTs that are safe to repeat (e.g. validate_only dry runs).
+    """
+    if idempotent is None:
+        idempotent = method.upper() != "POST"
+    return _send(method, f"{_base_url()}{path}", idempotent, **kwargs)
+
+
 def api_get(path, params=None):
     """GET request with Bearer auth. Returns parsed JSON."""
-    url = f"{_base_url()}{path}"
-    resp = requests.get(url, headers=_headers(), params=params)
-    resp.raise_for_status()
-    return resp.json()
+    return api_request("GET", path, params=params).json()
 
 
-def api_post(path, json_body=None, params=None):
+def api_post(path, json_body=None, params=None, idempotent=False):
     """POST request with JSON body and Bearer auth. Returns parsed JSON."""
-    url = f"{_base_url()}{path}"
-    resp = requests.post(url, headers=_headers(), json=json_body, params=params)
-    resp.raise_for_status()
-    return resp.json()
+    return api_request("POST", path, idempotent=idempotent, json=json_body, params=params).json()
 
 
-def api_post_multipart(path, file_path, params=None):
+def api_post_multipart(path, file_path, params=None, idempotent=False):
     """
     POST multipart/form-data with a YAML file upload (field name 'data_file').
     Returns parsed JSON.
     """
-    url = f"{_base_url()}{path}"
     filename = os.path.basename(file_path)
     with open(file_path, "rb") as f:
-        files = {"data_file": (filename, f, "application/x-yaml")}
-        resp = requests.post(url, headers=_headers(), files=files, params=params)
-    resp.raise_for_status()
-    return resp.json()
+        content = f.read()  # read up front so a retried request can be resent
+    files = {"data_file": (filename, content, "application/x-yaml")}
+    return api_request("POST", path, idempotent=idempotent, files=files, params=params).json()
 
 
 # ── Self-test ───────────────────────────────────────────────────────────────
@@ -14,7 +14,7 @@ import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from cs_auth import load_env, api_get, api_post
+from cs_auth import load_env, api_get, api_post, deadline_remaining, DeadlineExceeded
 
 # Fix Windows console encoding
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
@@ -117,10 +117,13 @@ def execute_workflow(definition_id, params, depth=1):
 
 def poll_results(execution_id, timeout=120, interval=5):
     """
-    Poll for execution results until complete or timeout.
-    Returns the result body or None.
+    Poll for execution results until complete, timeout or the command
+    deadline (CS_DEADLINE). Returns the result body or None.
     """
     start = time.time()
+    remaining = deadline_remaining()
+    if remaining is not None and remaining < timeout:
+        timeout = max(0, int(remaining))
     print(f"\n  Polling for results (timeout: {timeout}s)...")
     while time.time() - start < timeout:
         try:
@@ -132,9 +135,11 @@ def poll_results(execution_id, timeout=120, interval=5):
                 if status in ("completed", "failed", "error"):
                     return result
                 print(f"    Status: {status} ({int(time.time() - start)}s elapsed)")
+        except DeadlineExceeded:
+            break
         except Exception as e:
             print(f"    Poll error: {e}")
-        time.sleep(interval)
+        time.sleep(max(0, min(interval, start + timeout - time.time())))
 
     print(f"  Timeout after {timeout}s — execution may still be running.")
     return None
@@ -6,15 +6,25 @@ Usage:
     python export.py --id <wf_id> --output file.yaml   # Save to file
     python export.py --list                             # List all definitions
     python export.py --list --json                      # Machine-readable
+    python export.py --all --output-dir backups/        # Export every definition
+    python export.py --ids-from ids.txt --output-dir backups/  # Export listed IDs
+    python export.py --sync --output-dir backups/       # Re-export only what changed
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
+import re
 import sys
 import os
+import time
+
+import requests
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from cs_auth import load_env, api_get
+from cs_auth import api_get, api_request, atomic_write
+import cs_async
 
 # Fix Windows console encoding
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
@@ -23,33 +33,31 @@ EXPORT_ENDPOINT = "/workflows/entities/definitions/export/v1"
 DEFINITIONS_COMBINED = "/workflows/combined/definitions/v1"
 
 
-def export_workflow(workflow_id):
+def _export_error(resp):
     """
-    Export a workflow as YAML. Returns the raw YAML string.
+    Return the API error message carried by an export response, or None.
     Note: the export endpoint returns YAML directly, not JSON.
     """
-    import requests as req_lib
-
-    load_env()
-    from cs_auth import _base_url, _headers
-
-    url = f"{_base_url()}{EXPORT_ENDPOINT}"
-    resp = req_lib.get(url, headers=_headers(), params={"id": workflow_id})
-    resp.raise_for_status()
-
     content_type = resp.headers.get("Content-Type", "")
     if "yaml" in content_type or "text" in content_type:
-        return resp.text
+        return None
     # If JSON response, it might contain errors
     try:
-        body = resp.json()
-        errors = body.get("errors", [])
-        if errors:
-            msg = "; ".join(e.get("message", str(e)) for e in errors)
-            print(f"  Export error: {msg}", file=sys.stderr)
-            sys.exit(1)
+        errors = resp.json().get("errors", [])
     except Exception:
-        pass
+        return None
+    if errors:
+        return "; ".join(e.get("message", str(e)) for e in errors)
+    return None
+
+
+def export_workflow(workflow_id):
+    """Export a workflow as YAML. Returns the raw YAML string."""
+    resp = api_request("GET", EXPORT_ENDPOINT, params={"id": workflow_id})
+    msg = _export_error(resp)
+    if msg:
+        print(f"  Export error: {msg}", file=sys.stderr)
+        sys.exit(1)
     return resp.text
 
 
@@ -70,6 +78,145 @@ def list_definitions(limit=100, offset=0):
     return all_defs
 
 
+# ── Bulk export ─────────────────────────────────────────────────────────────
+
+def read_ids(path):
+    """Read workflow IDs from a file: one per line, blank lines and # comments ignored."""
+    ids = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line and line not in ids:
+                ids.append(line)
+    return ids
+
+
+def export_filenames(defs):
+    """Map definition ID -> file name derived from the workflow name (unique within *defs*)."""
+    names = {}
+    for d in defs:
+        did = d.get("id", "")
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", d.get("name") or did).strip("_").lower() or did
+        names[did] = slug
+    counts = {}
+    for slug in names.values():
+        counts[slug] = counts.get(slug, 0) + 1
+    return {did: (f"{slug}_{did}" if counts[slug] > 1 else slug) + ".yaml" for did, slug in names.items()}
+
+
+async def _export_one(d, path):
+    did = d.get("id", "")
+    result = {"id": did, "name": d.get("name", did), "file": path, "bytes": 0, "sha256": None, "error": None}
+    try:
+        resp = await cs_async.api_request("GET", EXPORT_ENDPOINT, params={"id": did})
+        result["error"] = _export_error(resp)
+        if not result["error"]:
+            data = resp.content
+            atomic_write(path, data, mode=0o644)
+            result["bytes"] = len(data)
+            result["sha256"] = hashlib.sha256(data).hexdigest()
+    except requests.HTTPError as e:
+        result["error"] = _export_error(e.response) or str(e)
+    except (requests.RequestException, OSError) as e:
+        result["error"] = str(e)
+    return result
+
+
+async def _export_many(defs, output_dir, filenames, on_result):
+    tasks = [_export_one(d, os.path.join(output_dir, filenames[d.get("id", "")])) for d in defs]
+    results = []
+    for fut in asyncio.as_completed(tasks):
+        result = await fut
+        on_result(result)
+        results.append(result)
+    return results
+
+
+def export_all(defs, output_dir, on_result=lambda r: None, filenames=None):
+    """
+    Export every definition in *defs* into *output_dir* concurrently.
+    Calls on_result(result) as each finishes; returns the list of results
+    ({id, name, file, bytes, sha256, error}).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    filenames = filenames or export_filenames(defs)
+    return asyncio.run(_export_many(defs, output_dir, filenames, on_result))
+
+
+# ── Incremental sync ────────────────────────────────────────────────────────
+# The output directory keeps a manifest of what was exported:
+#   {"synced_at": ..., "workflows": {id: {name, file, last_modified, sha256}}}
+# A definition is re-exported only when its last_modified_timestamp differs
+# from the manifest (or is missing), or when its file is gone.
+
+MANIFEST_FILE = ".export_manifest.json"
+
+
+def load_manifest(output_dir):
+    """Return the sync manifest for *output_dir* (empty if none or unreadable)."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get("workflows"), dict):
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"workflows": {}}
+
+
+def sync_exports(defs, output_dir, on_result=lambda r: None):
+    """
+    Bring *output_dir* up to date with *defs*, exporting only new or modified
+    definitions. Returns (results, unchanged_count, removed_entries).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    entries = load_manifest(output_dir)["workflows"]
+    live = {d.get("id", ""): d for d in defs}
+
+    stale, stale_ids, kept = [], set(), {}
+    for did, d in live.items():
+        entry = entries.get(did)
+        modified = d.get("last_modified_timestamp")
+        if (entry and modified and entry.get("last_modified") == modified
+                and os.path.isfile(os.path.join(output_dir, entry.get("file", "")))):
+            kept[did] = entry
+        else:
+            stale.append(d)
+            stale_ids.add(did)
+
+    # Keep existing file names stable; never reuse one still owned by another workflow
+    taken = {e["file"] for e in kept.values()}
+    filenames = {}
+    for did, name in export_filenames(defs).items():
+        if did not in stale_ids:
+            continue
+        if name in taken:
+            name = f"{os.path.splitext(name)[0]}_{did}.yaml"
+        filenames[did] = name
+        taken.add(name)
+
+    results = export_all(stale, output_dir, on_result, filenames) if stale else []
+    for r in results:
+        old = entries.get(r["id"])
+        if r["error"]:
+            if old:
+                kept[r["id"]] = old  # retried on the next sync
+            continue
+        name = os.path.basename(r["file"])
+        if old and old.get("file") not in (None, name) and old["file"] not in taken:
+            try:
+                os.remove(os.path.join(output_dir, old["file"]))  # workflow was renamed
+            except OSError:
+                pass
+        kept[r["id"]] = {"name": r["name"], "file": name, "sha256": r["sha256"],
+                         "last_modified": live[r["id"]].get("last_modified_timestamp", "")}
+
+    removed = {did: e for did, e in entries.items() if did not in live}
+    manifest = {"synced_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "workflows": kept}
+    atomic_write(os.path.join(output_dir, MANIFEST_FILE), json.dumps(manifest, indent=2), mode=0o644)
+    return results, len(live) - len(stale), removed
+
+
 def format_definition(d):
     """Format a definition for human display."""
     did = d.get("id", "?")
@@ -85,7 +232,13 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--id", metavar="WF_ID", help="Workflow definition ID to export")
     group.add_argument("--list", "-l", action="store_true", help="List all definitions")
+    group.add_argument("--all", action="store_true", help="Export every definition into --output-dir")
+    group.add_argument("--ids-from", metavar="FILE", help="Export the IDs listed in FILE (one per line) into --output-dir")
+    group.add_argument("--sync", action="store_true",
+                       help="Mirror all definitions into --output-dir, re-exporting only those modified since the last sync")
     parser.add_argument("--output", "-o", metavar="FILE", help="Save exported YAML to file")
+    parser.add_argument("--output-dir", metavar="DIR", default="exported_workflows",
+                        help="Directory for --all / --ids-from / --sync exports (default: exported_workflows)")
     parser.add_argument("--json", action="store_true", help="Machine-readable JSON output")
     args = parser.parse_args()
 
@@ -98,6 +251,46 @@ def main():
         else:
             print(yaml_content)
 
+    elif args.all or args.ids_from or args.sync:
+        defs = list_definitions()
+        if args.ids_from:
+            by_id = {d.get("id"): d for d in defs}
+            defs = [by_id.get(did, {"id": did, "name": did}) for did in read_ids(args.ids_from)]
+
+        def report(r):
+            if args.json:
+                return
+            if r["error"]:
+                print(f"  FAIL  {r['name']}  ({r['id']}): {r['error']}")
+            else:
+                print(f"  OK    {r['name']}  -> {r['file']}  ({r['bytes']:,} bytes)")
+
+        if not args.json:
+            verb = "Syncing" if args.sync else "Exporting"
+            print(f"\n{verb} {len(defs)} workflow(s) to {args.output_dir}/\n")
+        start = time.time()
+        if args.sync:
+            results, unchanged, removed = sync_exports(defs, args.output_dir, report)
+        else:
+            results = export_all(defs, args.output_dir, report)
+        elapsed = time.time() - start
+        failed = [r for r in results if r["error"]]
+        total_bytes = sum(r["bytes"] for r in results)
+        if args.json:
+            order = {d.get("id"): i for i, d in enumerate(defs)}
+            print(json.dumps(sorted(results, key=lambda r: order[r["id"]]), indent=2))
+        else:
+            print(f"\n  Exported {len(results) - len(failed)} of {len(results)} workflow(s), "
+                  f"{total_bytes:,} bytes in {elapsed:.1f}s")
+            if args.sync:
+                print(f"  {unchanged} unchanged since last sync")
+                for entry in removed.values():
+                    print(f"  Removed upstream: {entry.get('name')} (kept {entry.get('file')})")
+            if failed:
+                print(f"  {len(failed)} failed")
+        if failed:
+            sys.exit(1)
+
     elif args.list:
         defs = list_definitions()
         if args.json:
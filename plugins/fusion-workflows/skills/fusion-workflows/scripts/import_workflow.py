@@ -5,20 +5,32 @@ Validates first (unless --skip-validate), checks for duplicate names
 (unless --skip-duplicate-check), then imports.
 Prints the workflow definition ID on success.
 
+Each file's content hash and definition ID are recorded per tenant in a
+per-user import manifest: unchanged files are skipped without any API call,
+and changed ones update their existing definition in place.
+
 Usage:
     python import_workflow.py workflow.yaml                         # Validate + dup check + import
     python import_workflow.py --skip-validate workflow.yaml         # Skip validation
     python import_workflow.py --skip-duplicate-check workflow.yaml  # Skip duplicate check
-    python import_workflow.py *.yaml                                # Multiple files
+    python import_workflow.py *.yaml                                # Multiple files (in parallel,
+                                                                    #   sub-workflows before callers)
+    python import_workflow.py --workers 8 examples/bec/*.yaml       # Raise concurrency
+    python import_workflow.py --force workflow.yaml                 # Ignore the import manifest
 """
 
 import argparse
+import hashlib
+import json
 import re
 import sys
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from cs_auth import load_env, api_post_multipart
+from cs_auth import load_env, tenant_key, api_post_multipart, api_request, atomic_write, cache_file, file_lock
 from validate import validate_file
 from query_workflows import fetch_all_definitions
 
@@ -26,6 +38,7 @@ from query_workflows import fetch_all_definitions
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 
 IMPORT_ENDPOINT = "/workflows/entities/definitions/import/v1"
+DEFINITIONS_ENTITIES = "/workflows/entities/definitions/v1"
 
 
 def extract_name_from_yaml(file_path):
@@ -50,6 +63,20 @@ def check_duplicate(name, existing_names):
     return None
 
 
+def _error_text(e):
+    """Best error message for a failed API call (API errors from the response body if present)."""
+    error_text = str(e)
+    if hasattr(e, "response") and e.response is not None:
+        try:
+            err_json = e.response.json()
+            errs = err_json.get("errors", [])
+            if errs:
+                error_text = "; ".join(item.get("message", str(item)) for item in errs)
+        except Exception:
+            error_text = e.response.text[:500] if e.response.text else str(e)
+    return error_text
+
+
 def import_file(file_path):
     """
     Import a single YAML file. Returns (success, message, workflow_id).
@@ -65,16 +92,230 @@ def import_file(file_path):
         wf_id = resources[0].get("id") if resources else None
         return True, "OK", wf_id
     except Exception as e:
-        error_text = str(e)
-        if hasattr(e, "response") and e.response is not None:
-            try:
-                err_json = e.response.json()
-                errs = err_json.get("errors", [])
-                if errs:
-                    error_text = "; ".join(item.get("message", str(item)) for item in errs)
-            except Exception:
-                error_text = e.response.text[:500] if e.response.text else str(e)
-        return False, error_text, None
+        return False, _error_text(e), None
+
+
+def update_file(file_path, workflow_id):
+    """
+    Replace the definition *workflow_id* with a YAML file's contents (PUT).
+    Needs PyYAML to turn the YAML into the JSON definition body.
+    Returns (success, message).
+    """
+    try:
+        import yaml
+    except ImportError:
+        return False, ("PyYAML is required to update in place (pip install pyyaml); "
+                       "or delete the existing workflow and re-run with --force")
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            definition = yaml.safe_load(f)
+        body = {"id": workflow_id, "definition": definition,
+                "change_log": f"Updated from {os.path.basename(file_path)} by import_workflow.py"}
+        result = api_request("PUT", DEFINITIONS_ENTITIES, json=body).json()
+        errors = result.get("errors", [])
+        if errors:
+            return False, "; ".join(e.get("message", str(e)) for e in errors)
+        return True, "OK"
+    except Exception as e:
+        return False, _error_text(e)
+
+
+# ── Import manifest ─────────────────────────────────────────────────────────
+# {tenant: {absolute file path: {sha256, id, name, imported_at}}} in a per-user
+# cache file, where tenant is a hash of the API client ID and base URL. Kept
+# out of the workflow directories so it never ends up in the user's repo.
+# CS_IMPORT_MANIFEST relocates the file, or "off" disables it.
+
+def file_sha256(file_path):
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def load_manifest(tenant):
+    """Return {absolute file path: entry} for *tenant* (empty if none or disabled)."""
+    path = cache_file("CS_IMPORT_MANIFEST", "imports.json")
+    if not path:
+        return {}
+    return _read_manifest(path).get(tenant, {})
+
+
+def record_imports(tenant, entries):
+    """Merge {file_path: entry} into the tenant's import manifest."""
+    path = cache_file("CS_IMPORT_MANIFEST", "imports.json")
+    if not path or not entries:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with file_lock(path + ".lock"):
+            manifest = _read_manifest(path)
+            manifest.setdefault(tenant, {}).update(
+                (os.path.abspath(fp), entry) for fp, entry in entries.items())
+            atomic_write(path, json.dumps(manifest, indent=2))
+    except OSError as e:
+        print(f"    WARNING: could not write import manifest {path}: {e}", file=sys.stderr)
+
+
+# ── Import pipeline ─────────────────────────────────────────────────────────
+# The files form a dependency DAG: an "Execute workflow" action that names
+# (workflow_name:) another workflow in the batch makes that file a dependency.
+# Files are imported level by level, leaves first, with each level checked,
+# validated and imported concurrently.  Before a parent is imported, any
+# workflow_id / definition_id key beside a workflow_name: reference is filled
+# with the ID of the named workflow (freshly imported, or already in the CID).
+
+SUBWORKFLOW_REF = re.compile(r"^\s*workflow_name:\s*['\"]?(.+?)['\"]?\s*$", re.MULTILINE)
+SUBWORKFLOW_ID_KEY = re.compile(r"^(\s*)(workflow_id|definition_id)\s*:")
+
+
+def referenced_workflows(file_path):
+    """Return the lower-cased names of workflows a YAML file executes."""
+    with open(file_path, encoding="utf-8") as f:
+        return {name.lower() for name in SUBWORKFLOW_REF.findall(f.read())}
+
+
+def dependency_graph(files):
+    """Return ({file: name_lower}, {file: set of batch files it executes})."""
+    names = {}
+    for fp in files:
+        name = extract_name_from_yaml(fp)
+        if name:
+            names[fp] = name.lower()
+    by_name = {name: fp for fp, name in names.items()}
+    deps = {}
+    for fp in files:
+        deps[fp] = {by_name[ref] for ref in referenced_workflows(fp) if ref in by_name} - {fp}
+    return names, deps
+
+
+def dependency_levels(files, deps):
+    """Group *files* into DAG levels, leaves first. Returns (levels, files_in_cycles)."""
+    remaining = {fp: set(deps[fp]) for fp in files}
+    levels = []
+    while remaining:
+        ready = [fp for fp in files if fp in remaining and not remaining[fp]]
+        if not ready:
+            break
+        levels.append(ready)
+        for fp in ready:
+            del remaining[fp]
+        for pending in remaining.values():
+            pending.difference_update(ready)
+    return levels, [fp for fp in files if fp in remaining]
+
+
+def _block_bounds(lines, i, indent):
+    """Return the (start, end) line range of the mapping that holds line *i*."""
+    def inside(line):
+        stripped = line.strip()
+        return not stripped or stripped.startswith("#") or len(line) - len(line.lstrip()) >= indent
+    start = i
+    while start > 0 and inside(lines[start - 1]):
+        start -= 1
+    end = i + 1
+    while end < len(lines) and inside(lines[end]):
+        end += 1
+    return start, end
+
+
+def substitute_workflow_ids(content, ids):
+    """
+    Fill workflow_id / definition_id keys that sit beside a workflow_name:
+    reference with the ID from *ids* (name_lower -> definition ID).
+    Returns (new_content, number_of_substitutions).
+    """
+    lines = content.split("\n")
+    count = 0
+    for i, line in enumerate(lines):
+        match = SUBWORKFLOW_REF.match(line)
+        if not match or match.group(1).lower() not in ids:
+            continue
+        indent = len(line) - len(line.lstrip())
+        start, end = _block_bounds(lines, i, indent)
+        for j in range(start, end):
+            key = SUBWORKFLOW_ID_KEY.match(lines[j])
+            if key and len(key.group(1)) == indent:
+                replacement = f"{key.group(1)}{key.group(2)}: {ids[match.group(1).lower()]}"
+                if lines[j] != replacement:
+                    lines[j] = replacement
+                    count += 1
+    return "\n".join(lines), count
+
+
+def process_file(fp, existing_names, skip_validate, ids=None, update_id=None):
+    """
+    Run the duplicate check, validation and import for one file, after linking
+    sub-workflow IDs from *ids* (name_lower -> definition ID). With
+    *update_id*, the existing definition is updated instead of importing.
+    Returns (basename, status, workflow_id, log_lines).
+    """
+    basename = os.path.basename(fp)
+    log = []
+
+    # Check for duplicate name
+    if existing_names and not update_id:
+        wf_name = extract_name_from_yaml(fp)
+        if wf_name:
+            dup_id = check_duplicate(wf_name, existing_names)
+            if dup_id:
+                log.append(f"DUPLICATE: '{wf_name}' already exists (ID: {dup_id})")
+                log.append("Skipping — delete or rename the existing workflow first")
+                return basename, "DUPLICATE", None if dup_id == "?" else dup_id, log
+
+    # Link sub-workflow IDs into a temporary copy (the source file is untouched)
+    if ids:
+        with open(fp, encoding="utf-8") as f:
+            linked, count = substitute_workflow_ids(f.read(), ids)
+        if count:
+            log.append(f"Linked {count} sub-workflow ID(s)")
+            with tempfile.TemporaryDirectory() as tmp:
+                linked_fp = os.path.join(tmp, basename)
+                with open(linked_fp, "w", encoding="utf-8") as f:
+                    f.write(linked)
+                status, wf_id, more = _validate_and_import(linked_fp, skip_validate, update_id)
+            return basename, status, wf_id, log + more
+
+    status, wf_id, more = _validate_and_import(fp, skip_validate, update_id)
+    return basename, status, wf_id, log + more
+
+
+def _validate_and_import(fp, skip_validate, update_id=None):
+    """
+    Validate (unless skipped) and import *fp*, or update definition
+    *update_id* with it. Returns (status, workflow_id, log_lines).
+    """
+    log = []
+
+    # Validate first
+    if not skip_validate:
+        passed, messages = validate_file(fp)
+        log.extend(messages)
+        if not passed:
+            return "VALIDATION FAILED", None, log
+
+    if update_id:
+        ok, msg = update_file(fp, update_id)
+        if ok:
+            log.append(f"Changed since last import — updated ID: {update_id}")
+            return "UPDATED", update_id, log
+        log.append(f"UPDATE FAILED: {msg}")
+        return "UPDATE FAILED", None, log
+
+    # Import
+    ok, msg, wf_id = import_file(fp)
+    if ok:
+        log.append(f"Imported — ID: {wf_id}")
+        return "IMPORTED", wf_id, log
+    log.append(f"IMPORT FAILED: {msg}")
+    return "IMPORT FAILED", None, log
 
 
 def main():
@@ -82,11 +323,44 @@ def main():
     parser.add_argument("files", nargs="+", metavar="FILE", help="YAML file(s) to import")
     parser.add_argument("--skip-validate", action="store_true", help="Skip pre-import validation")
     parser.add_argument("--skip-duplicate-check", action="store_true", help="Skip duplicate name check")
+    parser.add_argument("--workers", type=int, default=4, metavar="N",
+                        help="Files validated/imported in parallel (default: 4)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the import manifest: import every file as new")
     args = parser.parse_args()
 
+    # A file named twice (or matched by overlapping globs) is imported once
+    unique = {}
+    for fp in args.files:
+        unique.setdefault(os.path.abspath(fp), fp)
+    args.files = list(unique.values())
+
+    results = []
+    names, deps = dependency_graph(args.files)
+
+    # Files imported before: unchanged ones are done, changed ones are updates
+    tenant = tenant_key()
+    hashes = {fp: file_sha256(fp) for fp in args.files}
+    unchanged, update_ids = {}, {}
+    if not args.force:
+        manifest = load_manifest(tenant)
+        for fp in args.files:
+            entry = manifest.get(os.path.abspath(fp))
+            if not entry or not entry.get("id"):
+                continue
+            if entry.get("sha256") == hashes[fp]:
+                unchanged[fp] = entry["id"]
+            else:
+                update_ids[fp] = entry["id"]
+    for fp, wf_id in unchanged.items():
+        print(f"\n  {os.path.basename(fp)}")
+        print(f"    Unchanged since last import — ID: {wf_id}")
+        results.append((os.path.basename(fp), "UNCHANGED", wf_id))
+
     # Pre-fetch existing workflow names for duplicate checking
     existing_names = {}
-    if not args.skip_duplicate_check:
+    new_files = [fp for fp in args.files if fp not in unchanged and fp not in update_ids]
+    if new_files and not args.skip_duplicate_check:
         print("\n  Checking for duplicate workflow names...")
         try:
             all_defs = fetch_all_definitions()
@@ -96,56 +370,85 @@ def main():
             print(f"    WARNING: Could not fetch existing workflows: {e}", file=sys.stderr)
             print("    Skipping duplicate check — use --skip-duplicate-check to suppress")
 
-    results = []
+    levels, cyclic = dependency_levels(args.files, deps)
+    levels = [level for level in ([fp for fp in lvl if fp not in unchanged] for lvl in levels) if level]
+    for fp in cyclic:
+        print(f"\n  {os.path.basename(fp)}")
+        print("    DEPENDENCY CYCLE: executes a workflow that (indirectly) executes it")
+        results.append((os.path.basename(fp), "DEPENDENCY CYCLE", None))
 
-    for fp in args.files:
-        basename = os.path.basename(fp)
-        print(f"\n  {basename}")
-
-        # Check for duplicate name
-        if existing_names:
-            wf_name = extract_name_from_yaml(fp)
-            if wf_name:
-                dup_id = check_duplicate(wf_name, existing_names)
-                if dup_id:
-                    print(f"    DUPLICATE: '{wf_name}' already exists (ID: {dup_id})")
-                    print(f"    Skipping — delete or rename the existing workflow first")
-                    results.append((basename, "DUPLICATE", None))
-                    continue
+    # Definition IDs by lower-cased name: existing workflows, then each import
+    ids = {name: d.get("id") for name, d in existing_names.items() if d.get("id")}
+    ids.update((names[fp], wf_id) for fp, wf_id in unchanged.items() if fp in names)
+    ids.update((names[fp], wf_id) for fp, wf_id in update_ids.items() if fp in names)
+    status = {fp: "UNCHANGED" for fp in unchanged}
+    ok_statuses = ("IMPORTED", "UPDATED", "UNCHANGED", "DUPLICATE")
+    recorded = {}
 
-        # Validate first
-        if not args.skip_validate:
-            passed, messages = validate_file(fp)
-            for m in messages:
-                print(f"    {m}")
-            if not passed:
-                results.append((basename, "VALIDATION FAILED", None))
-                continue
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for n, level in enumerate(levels, 1):
+            if len(levels) > 1:
+                print(f"\n  Level {n}/{len(levels)} — {len(level)} file(s)")
+            futures = {}
+            for fp in level:
+                failed_deps = [d for d in deps[fp] if status.get(d) not in ok_statuses]
+                if failed_deps:
+                    basename = os.path.basename(fp)
+                    print(f"\n  {basename}")
+                    print(f"    Skipping — sub-workflow(s) not imported: "
+                          f"{', '.join(os.path.basename(d) for d in failed_deps)}")
+                    status[fp] = "DEPENDENCY FAILED"
+                    results.append((basename, "DEPENDENCY FAILED", None))
+                    continue
+                futures[pool.submit(process_file, fp, existing_names, args.skip_validate,
+                                    dict(ids), update_ids.get(fp))] = fp
+            for future in as_completed(futures):
+                fp = futures[future]
+                basename, status[fp], wf_id, log = future.result()
+                print(f"\n  {basename}")
+                for line in log:
+                    print(f"    {line}")
+                if wf_id and fp in names:
+                    ids[names[fp]] = wf_id
+                # A duplicate is recorded against the existing definition, so later
+                # runs skip it while unchanged and update it in place once edited
+                if status[fp] in ("IMPORTED", "UPDATED", "DUPLICATE") and wf_id:
+                    recorded[fp] = {"sha256": hashes[fp], "id": wf_id, "name": extract_name_from_yaml(fp),
+                                    "imported_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+                results.append((basename, status[fp], wf_id))
 
-        # Import
-        ok, msg, wf_id = import_file(fp)
-        if ok:
-            print(f"    Imported — ID: {wf_id}")
-            results.append((basename, "IMPORTED", wf_id))
-        else:
-            print(f"    IMPORT FAILED: {msg}")
-            results.append((basename, "IMPORT FAILED", None))
+    if recorded:
+        record_imports(tenant, recorded)
 
-    # Summary
+    # Summary (in command-line order)
+    order = {os.path.basename(fp): i for i, fp in enumerate(args.files)}
+    results.sort(key=lambda r: order[r[0]])
     print(f"\n{'─' * 50}")
     imported = [r for r in results if r[1] == "IMPORTED"]
+    updated = [r for r in results if r[1] == "UPDATED"]
+    skipped = [r for r in results if r[1] == "UNCHANGED"]
     duplicates = [r for r in results if r[1] == "DUPLICATE"]
-    failed = [r for r in results if "FAILED" in r[1]]
+    failed = [r for r in results if r[1] not in ok_statuses]
 
     if imported:
         print(f"  Imported ({len(imported)}):")
         for name, _, wf_id in imported:
             print(f"    {name} → {wf_id}")
 
+    if updated:
+        print(f"  Updated ({len(updated)}):")
+        for name, _, wf_id in updated:
+            print(f"    {name} → {wf_id}")
+
+    if skipped:
+        print(f"  Skipped — unchanged ({len(skipped)}):")
+        for name, _, wf_id in skipped:
+            print(f"    {name} → {wf_id}")
+
     if duplicates:
         print(f"  Skipped — duplicate ({len(duplicates)}):")
-        for name, _, _ in duplicates:
-            print(f"    {name}")
+        for name, _, wf_id in duplicates:
+            print(f"    {name} (existing ID: {wf_id})")
 
     if failed:
         print(f"  Failed ({len(failed)}):")
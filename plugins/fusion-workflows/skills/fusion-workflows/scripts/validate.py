@@ -2,36 +2,53 @@
 Validate CrowdStrike Fusion workflow YAML files.
 
 Performs two levels of validation:
-  1. Pre-flight: checks header comment, required top-level keys, PLACEHOLDER markers
+  1. Pre-flight: checks header comment, PLACEHOLDER markers, the parsed YAML
+     structure (required keys, types, action IDs) — see workflow_schema.py —
+     and the node wiring (dangling next/else, unreachable nodes, cycles) —
+     see workflow_graph.py
   2. API: dry-run import via POST /workflows/entities/definitions/import/v1?validate_only=true
 
+API passes are cached per (file content, tenant, validator version), so an
+unchanged file is not re-uploaded on the next run.
+
 Usage:
     python validate.py workflow.yaml                    # Validate one file
     python validate.py *.yaml                           # Validate multiple files
     python validate.py --preflight-only workflow.yaml   # Skip API call
+    python validate.py --force workflow.yaml            # Ignore cached API results
 """
 
 import argparse
+import hashlib
+import json
 import re
 import sys
 import os
+import threading
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from cs_auth import load_env, api_post_multipart
+from cs_auth import load_env, api_post_multipart, atomic_write, cache_file, file_lock, tenant_key
+from workflow_schema import load_workflow, check_workflow
+from workflow_graph import analyze_workflow
 
 # Fix Windows console encoding
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 
 IMPORT_ENDPOINT = "/workflows/entities/definitions/import/v1"
 
+# Bump when the checks change so cached results from older versions are ignored
+VALIDATOR_VERSION = "3"
+
 REQUIRED_KEYS = {"name", "trigger"}
 PLACEHOLDER_PATTERN = re.compile(r"PLACEHOLDER_[A-Z_]+")
 
 
-def preflight_check(file_path):
+def preflight_check(file_path, notes=None):
     """
     Local checks before hitting the API. Returns list of warning/error strings.
-    Empty list means all pre-flight checks passed.
+    Empty list means all pre-flight checks passed. If *notes* is a list, an
+    informational summary of the workflow graph is appended to it.
     """
     issues = []
 
@@ -47,11 +64,22 @@ def preflight_check(file_path):
     if not lines or not lines[0].startswith("#"):
         issues.append("WARNING: Missing header comment (first line should start with #)")
 
-    # Check for required top-level keys (simple text scan — not a full YAML parser)
-    for key in REQUIRED_KEYS:
-        # Match key at start of line (top-level) followed by colon
-        if not re.search(rf"^{key}\s*:", content, re.MULTILINE):
-            issues.append(f"ERROR: Missing required top-level key '{key}'")
+    # Parse and check the structure against references/yaml-schema.md
+    doc, parse_issues = load_workflow(file_path)
+    issues.extend(parse_issues)
+    if doc is not None:
+        schema_issues = check_workflow(doc)
+        issues.extend(schema_issues)
+        if not any(i.startswith("ERROR") for i in schema_issues):
+            graph_issues, summary = analyze_workflow(doc)
+            issues.extend(graph_issues)
+            if notes is not None:
+                notes.append(summary)
+    elif not any(i.startswith("ERROR") for i in parse_issues):
+        # PyYAML not installed — fall back to a text scan for required top-level keys
+        for key in REQUIRED_KEYS:
+            if not re.search(rf"^{key}\s*:", content, re.MULTILINE):
+                issues.append(f"ERROR: Missing required top-level key '{key}'")
 
     # Check for PLACEHOLDER markers
     placeholders = PLACEHOLDER_PATTERN.findall(content)
@@ -68,7 +96,8 @@ def api_validate(file_path):
     Returns (success: bool, message: str).
     """
     try:
-        result = api_post_multipart(IMPORT_ENDPOINT, file_path, params={"validate_only": "true"})
+        result = api_post_multipart(IMPORT_ENDPOINT, file_path, params={"validate_only": "true"},
+                                    idempotent=True)
         errors = result.get("errors", [])
         if errors:
             msg = "; ".join(e.get("message", str(e)) for e in errors)
@@ -88,17 +117,72 @@ def api_validate(file_path):
         return False, error_text
 
 
-def validate_file(file_path, preflight_only=False):
+# ── Validation cache ────────────────────────────────────────────────────────
+# Only API passes are cached: a failure may be transient or fixed on the
+# tenant side, so it is always re-checked. Entries expire after 30 days.
+# CS_VALIDATION_CACHE relocates the cache file, or "off" disables it.
+
+_VALIDATION_MAX_AGE = 30 * 86400
+_validation_lock = threading.Lock()
+
+
+def _validation_key(file_path):
+    with open(file_path, "rb") as f:
+        content = hashlib.sha256(f.read()).hexdigest()
+    return hashlib.sha256(f"{VALIDATOR_VERSION}|{tenant_key()}|{content}".encode("utf-8")).hexdigest()
+
+
+def _read_validation_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_validation(file_path):
+    """True if the file's current content already passed API validation."""
+    path = cache_file("CS_VALIDATION_CACHE", "validation.json")
+    if not path:
+        return False
+    entry = _read_validation_cache(path).get(_validation_key(file_path))
+    return bool(entry) and time.time() - entry.get("ts", 0) < _VALIDATION_MAX_AGE
+
+
+def record_validation(file_path):
+    """Remember that the file's current content passed API validation."""
+    path = cache_file("CS_VALIDATION_CACHE", "validation.json")
+    if not path:
+        return
+    key = _validation_key(file_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _validation_lock, file_lock(path + ".lock"):
+            now = time.time()
+            cache = {k: v for k, v in _read_validation_cache(path).items()
+                     if now - v.get("ts", 0) < _VALIDATION_MAX_AGE}
+            cache[key] = {"ts": now, "file": os.path.basename(file_path)}
+            atomic_write(path, json.dumps(cache))
+    except OSError:
+        pass  # non-fatal — the file is just validated again next time
+
+
+def validate_file(file_path, preflight_only=False, force=False):
     """
     Validate a single file. Returns (passed: bool, messages: list[str]).
+    An unchanged file that already passed API validation is not re-uploaded
+    unless *force* is set.
     """
     messages = []
     basename = os.path.basename(file_path)
 
     # Pre-flight
-    issues = preflight_check(file_path)
+    notes = []
+    issues = preflight_check(file_path, notes)
     has_errors = any(i.startswith("ERROR") for i in issues)
     messages.extend(issues)
+    messages.extend(notes)
 
     if has_errors:
         messages.append("Pre-flight FAILED — fix errors above before API validation")
@@ -110,8 +194,13 @@ def validate_file(file_path, preflight_only=False):
         return not has_errors, messages
 
     # API validation
+    if not force and cached_validation(file_path):
+        messages.append("API validation passed (cached — unchanged since last pass)")
+        return True, messages
+
     ok, msg = api_validate(file_path)
     if ok:
+        record_validation(file_path)
         messages.append("API validation passed")
     else:
         messages.append(f"API validation FAILED: {msg}")
@@ -123,12 +212,13 @@ def main():
     parser = argparse.ArgumentParser(description="Validate Fusion workflow YAML files")
     parser.add_argument("files", nargs="+", metavar="FILE", help="YAML file(s) to validate")
     parser.add_argument("--preflight-only", action="store_true", help="Skip API validation")
+    parser.add_argument("--force", action="store_true", help="Re-run API validation even for unchanged files")
     args = parser.parse_args()
 
     all_passed = True
     for fp in args.files:
         print(f"\n  {os.path.basename(fp)}")
-        passed, messages = validate_file(fp, preflight_only=args.preflight_only)
+        passed, messages = validate_file(fp, preflight_only=args.preflight_only, force=args.force)
         for m in messages:
             prefix = "    \u2713" if not m.startswith(("ERROR", "WARNING")) and "FAILED" not in m else "    \u2717"
             print(f"{prefix} {m}")
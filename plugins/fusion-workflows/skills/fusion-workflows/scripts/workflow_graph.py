@@ -0,0 +1,212 @@
+"""
+Static analysis of how a Fusion workflow's nodes are wired together.
+
+Nodes (actions, loops, conditions) are linked by the trigger's `next`, each
+node's `next` and a condition's `else`. Every loop body is its own scope with
+its own trigger, so references never cross a loop boundary. For each scope
+this reports:
+
+  - dangling references  (`next`/`else` naming a node that does not exist)
+  - unreachable nodes    (nothing leads to them from the trigger)
+  - cycles               (a node that can lead back to itself)
+
+plus the loop nesting depth and the longest path through the workflow.
+
+    from workflow_graph import analyze_workflow
+
+    issues, summary = analyze_workflow(doc)   # doc from workflow_schema.load_workflow
+
+Issues are strings prefixed "ERROR:" or "WARNING:", as in validate.py.
+"""
+
+# Each nesting level multiplies iterations against the 100,000-per-loop limit
+MAX_LOOP_NESTING = 2
+
+
+# ── Graph ───────────────────────────────────────────────────────────────────
+
+def _mapping(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _labels(node, key):
+    value = _mapping(node).get(key)
+    return [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+
+
+def build_scopes(doc):
+    """
+    Split a parsed workflow into scopes: the top level, then every loop body.
+    Each scope is a dict with:
+      prefix   — location prefix for messages ("" or "loops.Loop.")
+      depth    — loop nesting depth (0 for the top level)
+      entry    — labels in the scope's trigger.next
+      kinds    — {label: "actions" | "loops" | "conditions"}
+      where    — {label: location string}
+      edges    — {label: [(key, target label)]}, key being "next" or "else"
+      loops    — {label: child scope} for loops started from this scope
+      duplicates — labels defined more than once
+    """
+    scopes = []
+
+    def add(node, prefix, depth):
+        scope = {"prefix": prefix, "depth": depth, "entry": _labels(node.get("trigger"), "next"),
+                 "kinds": {}, "where": {}, "edges": {}, "loops": {}, "duplicates": []}
+        scopes.append(scope)
+
+        def define(label, kind, where):
+            if label in scope["kinds"]:
+                scope["duplicates"].append(label)
+            scope["kinds"][label] = kind
+            scope["where"][label] = where
+            scope["edges"].setdefault(label, [])
+
+        for kind in ("actions", "loops", "conditions"):
+            for label, child in _mapping(node.get(kind)).items():
+                where = f"{prefix}{kind}.{label}"
+                define(label, kind, where)
+                scope["edges"][label] += [(key, t) for key in ("next", "else") for t in _labels(child, key)]
+                if kind == "loops":
+                    scope["loops"][label] = add(_mapping(child), f"{where}.", depth + 1)
+
+        # Sub-loops declared under an action run from that action
+        for label, action in _mapping(node.get("actions")).items():
+            for loop_label, loop in _mapping(_mapping(action).get("loops")).items():
+                where = f"{prefix}actions.{label}.loops.{loop_label}"
+                define(loop_label, "loops", where)
+                scope["edges"][label].append(("next", loop_label))
+                scope["loops"][loop_label] = add(_mapping(loop), f"{where}.", depth + 1)
+        return scope
+
+    add(_mapping(doc), "", 0)
+    return scopes
+
+
+def _reachable(scope):
+    seen, stack = set(), [t for t in scope["entry"] if t in scope["kinds"]]
+    while stack:
+        label = stack.pop()
+        if label in seen:
+            continue
+        seen.add(label)
+        stack.extend(t for _, t in scope["edges"][label] if t in scope["kinds"])
+    return seen
+
+
+def _unreachable(scope):
+    """
+    Return [(label, stranded)] for each unreachable node that no other
+    unreachable node leads to, with the number of nodes stranded behind it.
+    """
+    reachable = _reachable(scope)
+    dead = [label for label in scope["kinds"] if label not in reachable]
+    targets = {t for label in dead for _, t in scope["edges"][label]}
+    # Nodes nothing leads to first, then whatever is left (dead cycles)
+    ordered = [label for label in dead if label not in targets] + [label for label in dead if label in targets]
+    result, covered = [], set()
+    for root in ordered:
+        if root in covered:
+            continue
+        seen, stack = set(), [root]
+        while stack:
+            label = stack.pop()
+            if label not in seen and label in scope["kinds"] and label not in reachable:
+                seen.add(label)
+                stack.extend(t for _, t in scope["edges"][label])
+        covered |= seen
+        result.append((root, len(seen) - 1))
+    return result
+
+
+def _cycles(scope):
+    """Return each distinct cycle in the scope as a list of labels (first repeated last)."""
+    cycles, seen_sets = [], set()
+    state = {}  # label -> 1 while on the DFS stack, 2 when finished
+    for start in scope["kinds"]:
+        if start in state:
+            continue
+        path = [start]
+        state[start] = 1
+        iters = [iter(scope["edges"][start])]
+        while iters:
+            nxt = next(iters[-1], None)
+            if nxt is None:
+                state[path.pop()] = 2
+                iters.pop()
+                continue
+            target = nxt[1]
+            if target not in scope["kinds"]:
+                continue
+            if state.get(target) == 1:
+                cycle = path[path.index(target):] + [target]
+                key = frozenset(cycle)
+                if key not in seen_sets:
+                    seen_sets.add(key)
+                    cycles.append(cycle)
+            elif target not in state:
+                state[target] = 1
+                path.append(target)
+                iters.append(iter(scope["edges"][target]))
+    return cycles
+
+
+def _longest_path(scope):
+    """Longest chain of nodes from the trigger, counting loop bodies inline."""
+    memo = {}
+
+    def length(label):
+        if label not in memo:
+            memo[label] = 0  # guards against cycles; callers skip cyclic graphs
+            inner = _longest_path(scope["loops"][label]) if label in scope["loops"] else 0
+            after = [length(t) for _, t in scope["edges"][label] if t in scope["kinds"]]
+            memo[label] = 1 + inner + max(after, default=0)
+        return memo[label]
+
+    return max((length(t) for t in scope["entry"] if t in scope["kinds"]), default=0)
+
+
+# ── Analysis ────────────────────────────────────────────────────────────────
+
+def analyze_workflow(doc):
+    """
+    Check the node wiring of a parsed workflow.
+    Returns (issues, summary) where summary is a one-line description.
+    """
+    scopes = build_scopes(doc)
+    issues = []
+    cyclic = False
+
+    for scope in scopes:
+        where_trigger = f"{scope['prefix']}trigger"
+        for label in sorted(set(scope["duplicates"])):
+            issues.append(f"ERROR: {scope['where'][label]}: label '{label}' is defined more than once in this scope")
+
+        refs = [(where_trigger, "next", t) for t in scope["entry"]]
+        refs += [(scope["where"][src], key, t) for src, edges in scope["edges"].items()
+                 for key, t in edges]
+        for where, key, target in refs:
+            if target in scope["kinds"]:
+                continue
+            elsewhere = [s["where"][target] for s in scopes if target in s["kinds"]]
+            hint = f" (defined at {elsewhere[0]}, outside this scope)" if elsewhere else ""
+            issues.append(f"ERROR: {where}: '{key}' refers to unknown node '{target}'{hint}")
+
+        for label, stranded in _unreachable(scope):
+            after = f" ({stranded} node(s) after it are unreachable too)" if stranded else ""
+            issues.append(f"WARNING: {scope['where'][label]}: unreachable — no trigger, next or else leads here{after}")
+
+        for cycle in _cycles(scope):
+            cyclic = True
+            location = scope["prefix"].rstrip(".") or "workflow"
+            issues.append(f"ERROR: {location}: cycle {' → '.join(cycle)}")
+
+    depth = max(s["depth"] for s in scopes)
+    if depth > MAX_LOOP_NESTING:
+        issues.append(f"WARNING: loops are nested {depth} deep (more than {MAX_LOOP_NESTING}); "
+                      "each level multiplies the iteration count")
+
+    nodes = sum(len(s["kinds"]) for s in scopes)
+    summary = f"Graph: {nodes} node(s), loop nesting depth {depth}"
+    if not cyclic:
+        summary += f", longest path {_longest_path(scopes[0])} step(s)"
+    return issues, summary
@@ -0,0 +1,223 @@
+"""
+Offline structural checks for Fusion workflow YAML, following
+references/yaml-schema.md.
+
+The file is parsed with PyYAML and every node is checked for required keys,
+value types and well-formed IDs, so most mistakes are caught in milliseconds
+instead of by an API dry-run. PyYAML is optional: without it, load_workflow()
+reports that the structural checks were skipped.
+
+    from workflow_schema import load_workflow, check_workflow
+
+    doc, issues = load_workflow("workflow.yaml")
+    if doc is not None:
+        issues += check_workflow(doc)
+
+Issues are strings prefixed "ERROR:" or "WARNING:", as in validate.py.
+"""
+
+import re
+
+ACTION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+PARAMETER_TYPES = {"string", "integer", "number", "boolean", "array", "object"}
+
+TOP_LEVEL_KEYS = {"name", "description", "trigger", "actions", "loops", "conditions", "output_fields"}
+TRIGGER_KEYS = {"next", "name", "type", "parameters", "schedule", "event"}
+ACTION_KEYS = {"id", "name", "class", "next", "properties", "version_constraint", "loops"}
+LOOP_KEYS = {"name", "display", "for", "trigger", "actions", "loops", "conditions", "output_fields"}
+FOR_KEYS = {"input", "sequential", "continue_on_partial_execution"}
+CONDITION_KEYS = {"next", "else", "cel_expression", "expression", "display"}
+
+
+# ── Loading ─────────────────────────────────────────────────────────────────
+
+def load_workflow(file_path):
+    """
+    Parse a workflow file. Returns (doc, issues); doc is None if the file
+    could not be parsed or PyYAML is not installed.
+    """
+    try:
+        import yaml
+    except ImportError:
+        return None, ["WARNING: PyYAML not installed — structural checks skipped (pip install pyyaml)"]
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)), []
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        where = f" (line {mark.line + 1}, column {mark.column + 1})" if mark else ""
+        problem = getattr(e, "problem", None) or str(e)
+        return None, [f"ERROR: Invalid YAML{where}: {problem}"]
+
+
+# ── Checks ──────────────────────────────────────────────────────────────────
+
+class _Checker:
+    def __init__(self):
+        self.issues = []
+
+    def error(self, where, msg):
+        self.issues.append(f"ERROR: {where}: {msg}" if where else f"ERROR: {msg}")
+
+    def warning(self, where, msg):
+        self.issues.append(f"WARNING: {where}: {msg}" if where else f"WARNING: {msg}")
+
+    def mapping(self, node, where, what):
+        if not isinstance(node, dict):
+            self.error(where, f"{what} must be a mapping, got {_type_name(node)}")
+            return False
+        return True
+
+    def unknown_keys(self, node, allowed, where):
+        for key in node:
+            if key not in allowed:
+                self.warning(where, f"unexpected key '{key}'")
+
+    def required(self, node, keys, where):
+        for key in keys:
+            if key not in node:
+                self.error(where, f"missing required key '{key}'")
+
+    def string(self, node, key, where, required=False):
+        if key not in node:
+            if required:
+                self.error(where, f"missing required key '{key}'")
+            return
+        value = node[key]
+        if not isinstance(value, str) or (required and not value.strip()):
+            self.error(where, f"'{key}' must be a non-empty string, got {_type_name(value)}")
+
+    def boolean(self, node, key, where):
+        if key in node and not isinstance(node[key], bool):
+            self.error(where, f"'{key}' must be true or false, got {_type_name(node[key])}")
+
+    def string_list(self, node, key, where, required=False):
+        if key not in node:
+            if required:
+                self.error(where, f"missing required key '{key}'")
+            return
+        value = node[key]
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            self.error(where, f"'{key}' must be a list of strings, got {_type_name(value)}")
+        elif required and not value:
+            self.error(where, f"'{key}' must not be empty")
+
+    # Node types
+
+    def workflow(self, doc):
+        if not self.mapping(doc, "", "The workflow"):
+            return
+        self.unknown_keys(doc, TOP_LEVEL_KEYS, "top level")
+        for key in ("name", "trigger"):
+            if key not in doc:
+                self.error("", f"Missing required top-level key '{key}'")
+        self.string(doc, "name", "name")
+        self.string(doc, "description", "description")
+        if "trigger" in doc:
+            self.trigger(doc["trigger"], "trigger", top_level=True)
+        self.scope(doc, "")
+
+    def scope(self, node, prefix):
+        """Check the actions/loops/conditions/output_fields of a workflow or loop."""
+        for key, check in (("actions", self.action), ("loops", self.loop), ("conditions", self.condition)):
+            if key not in node:
+                continue
+            where = f"{prefix}{key}"
+            if self.mapping(node[key], where, f"'{key}'"):
+                for label, child in node[key].items():
+                    check(child, f"{where}.{label}")
+        self.string_list(node, "output_fields", f"{prefix}output_fields")
+
+    def trigger(self, trigger, where, top_level=False):
+        if not self.mapping(trigger, where, "The trigger"):
+            return
+        self.unknown_keys(trigger, TRIGGER_KEYS if top_level else {"next"}, where)
+        self.string_list(trigger, "next", where, required=True)
+        if not top_level:
+            return
+        for key in ("type", "name", "event"):
+            self.string(trigger, key, where)
+        if "parameters" in trigger:
+            self.parameters(trigger["parameters"], f"{where}.parameters")
+
+    def parameters(self, params, where):
+        if not self.mapping(params, where, "'parameters'"):
+            return
+        props = params.get("properties", {})
+        if not self.mapping(props, f"{where}.properties", "'properties'"):
+            return
+        for name, prop in props.items():
+            here = f"{where}.properties.{name}"
+            if not self.mapping(prop, here, "A parameter"):
+                continue
+            ptype = prop.get("type")
+            if ptype is not None and ptype not in PARAMETER_TYPES:
+                self.error(here, f"unknown type '{ptype}' (expected one of {', '.join(sorted(PARAMETER_TYPES))})")
+        self.string_list(params, "required", where)
+        for name in params.get("required") or []:
+            if isinstance(name, str) and name not in props:
+                self.error(f"{where}.required", f"'{name}' is not a defined parameter")
+
+    def action(self, action, where):
+        if not self.mapping(action, where, "An action"):
+            return
+        self.unknown_keys(action, ACTION_KEYS, where)
+        self.string(action, "id", where, required=True)
+        self.string(action, "name", where, required=True)
+        action_id = action.get("id")
+        if (isinstance(action_id, str) and not action_id.startswith("PLACEHOLDER_")
+                and not ACTION_ID_PATTERN.match(action_id)):
+            self.error(where, f"'id' must be a 32-character lowercase hex action ID, got '{action_id}'")
+        self.string(action, "class", where)
+        self.string(action, "version_constraint", where)
+        if "class" in action and "version_constraint" not in action:
+            self.error(where, f"class-based action '{action['class']}' requires 'version_constraint' (use ~1)")
+        self.string_list(action, "next", where)
+        if "properties" in action:
+            self.mapping(action["properties"], f"{where}.properties", "'properties'")
+        if "loops" in action and self.mapping(action["loops"], f"{where}.loops", "'loops'"):
+            for label, loop in action["loops"].items():
+                self.loop(loop, f"{where}.loops.{label}")
+
+    def loop(self, loop, where):
+        if not self.mapping(loop, where, "A loop"):
+            return
+        self.unknown_keys(loop, LOOP_KEYS, where)
+        self.required(loop, ("for", "trigger", "actions"), where)
+        self.string(loop, "name", where)
+        self.string(loop, "display", where)
+        if "for" in loop and self.mapping(loop["for"], f"{where}.for", "'for'"):
+            spec = loop["for"]
+            self.unknown_keys(spec, FOR_KEYS, f"{where}.for")
+            self.string(spec, "input", f"{where}.for", required=True)
+            self.boolean(spec, "sequential", f"{where}.for")
+            self.boolean(spec, "continue_on_partial_execution", f"{where}.for")
+        if "trigger" in loop:
+            self.trigger(loop["trigger"], f"{where}.trigger")
+        self.scope(loop, f"{where}.")
+
+    def condition(self, cond, where):
+        if not self.mapping(cond, where, "A condition"):
+            return
+        self.unknown_keys(cond, CONDITION_KEYS, where)
+        has_cel, has_fql = "cel_expression" in cond, "expression" in cond
+        if has_cel == has_fql:
+            self.error(where, "needs exactly one of 'cel_expression' or 'expression'")
+        self.string(cond, "cel_expression", where)
+        self.string(cond, "expression", where)
+        self.string_list(cond, "next", where)
+        self.string_list(cond, "else", where)
+        self.string_list(cond, "display", where)
+
+
+def _type_name(value):
+    if value is None:
+        return "nothing"
+    return {dict: "a mapping", list: "a list", str: "a string", bool: "a boolean"}.get(type(value), type(value).__name__)
+
+
+def check_workflow(doc):
+    """Check a parsed workflow against the documented schema. Returns a list of issues."""
+    checker = _Checker()
+    checker.workflow(doc)
+    return checker.issues